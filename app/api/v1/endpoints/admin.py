@@ -0,0 +1,74 @@
+"""
+Admin Endpoints
+Operational tooling guarded by ADMIN_TOKEN
+"""
+from fastapi import APIRouter, HTTPException, Depends, Header, status
+from fastapi.responses import FileResponse
+from typing import Optional
+import hmac
+
+from app.schemas.admin import ProfileInfo, ProfileListResponse
+from app.services.profiler import profiler_service
+from app.config import settings
+
+router = APIRouter()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject callers without the configured admin token"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "ADMIN_DISABLED",
+                "message": "Admin endpoints are disabled; set ADMIN_TOKEN to enable them"
+            }
+        )
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "error": "FORBIDDEN",
+                "message": "Missing or invalid X-Admin-Token header"
+            }
+        )
+
+
+@router.get(
+    "/admin/profiles",
+    response_model=ProfileListResponse,
+    dependencies=[Depends(require_admin)]
+)
+def list_profiles():
+    """
+    List captured request/task profiles, newest first
+    
+    Profiles are captured when PROFILING_ENABLED is set, for a
+    PROFILE_SAMPLE_RATE fraction of requests and tasks or for any request
+    carrying the PROFILE_HEADER header.
+    """
+    return ProfileListResponse(
+        profiles=[ProfileInfo(**profile) for profile in profiler_service.list_profiles()],
+        max_profiles=settings.PROFILE_MAX_FILES
+    )
+
+
+@router.get("/admin/profiles/{name}", dependencies=[Depends(require_admin)])
+def download_profile(name: str):
+    """
+    Download a profile as cProfile stats
+    
+    Open it with `python -m pstats <file>` or a viewer such as snakeviz.
+    """
+    path = profiler_service.get_path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "PROFILE_NOT_FOUND",
+                "message": f"Profile {name} not found"
+            }
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -0,0 +1,173 @@
+"""
+Bulk Deletion Endpoints
+"""
+from fastapi import APIRouter, HTTPException, Depends, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID, uuid4
+from datetime import datetime
+from typing import List
+import asyncio
+import logging
+
+from app.database import get_async_db
+from app.models.document import Document, DocumentStatus
+from app.models.job import DeletionJob, JobStatus
+from app.schemas.document import BulkDeleteRequest, DeletionJobResponse
+from app.services.counters import status_counters
+from app.services.cache import document_cache
+from app.tasks.cleanup import purge_deletion_job
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _mark_batch(db: AsyncSession, job: DeletionJob, conditions: list) -> List[str]:
+    """
+    Mark up to BULK_QUERY_BATCH_SIZE matching documents as deleting
+    
+    The rows are locked before they are counted, so a worker moving one
+    between the count and the UPDATE cannot make the status counters drift.
+    
+    Returns:
+        list: upload_ids of the documents marked
+    """
+    rows = (await db.execute(
+        select(Document.upload_id, Document.status)
+        .where(*conditions)
+        .limit(settings.BULK_QUERY_BATCH_SIZE)
+        .with_for_update()
+    )).all()
+    if not rows:
+        return []
+    
+    upload_ids = [row.upload_id for row in rows]
+    await db.execute(
+        update(Document)
+        .where(Document.upload_id.in_(upload_ids))
+        .values(
+            status=DocumentStatus.DELETING,
+            deletion_job_id=job.job_id,
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    deltas = {DocumentStatus.DELETING: len(rows)}
+    for row in rows:
+        deltas[row.status] = deltas.get(row.status, 0) - 1
+    await db.run_sync(status_counters.adjust, deltas)
+    job.total += len(rows)
+    return upload_ids
+
+
+@router.post(
+    "/documents/bulk-delete",
+    response_model=DeletionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def bulk_delete_documents(
+    request: BulkDeleteRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete many documents at once
+    
+    - **upload_ids**: Specific documents to delete (at most BULK_DELETE_MAX_IDS)
+    - **status**: Only documents in this status
+    - **created_before**: Only documents created before this time
+    
+    Criteria are combined with AND; at least one is required. Matching
+    documents are marked `deleting` immediately and disappear from reads;
+    files and rows are purged by a background job whose progress is
+    available from `GET /deletion-jobs/{job_id}`.
+    """
+    if not (request.upload_ids or request.status or request.created_before):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "EMPTY_CRITERIA",
+                "message": "Provide upload_ids, status or created_before"
+            }
+        )
+    
+    # Only the number of explicit IDs is kept; the job echoes its criteria
+    criteria = request.model_dump(mode="json", exclude_none=True, exclude={"upload_ids"})
+    if request.upload_ids:
+        criteria["upload_id_count"] = len(request.upload_ids)
+    job = DeletionJob(
+        job_id=str(uuid4()),
+        status=JobStatus.PENDING,
+        criteria=criteria,
+        total=0,
+        processed=0,
+        bytes_freed=0,
+        created_at=datetime.utcnow()
+    )
+    db.add(job)
+    
+    conditions = [Document.status != DocumentStatus.DELETING]
+    if request.status:
+        conditions.append(Document.status == request.status)
+    if request.created_before:
+        conditions.append(Document.created_at < request.created_before)
+    
+    # One batch per slice of explicit IDs; a filter is applied batch by batch,
+    # marked rows no longer match it
+    upload_ids = [str(upload_id) for upload_id in request.upload_ids or []]
+    batch_size = settings.BULK_QUERY_BATCH_SIZE
+    marked = []
+    if upload_ids:
+        for start in range(0, len(upload_ids), batch_size):
+            marked += await _mark_batch(
+                db, job, conditions + [Document.upload_id.in_(upload_ids[start:start + batch_size])]
+            )
+    else:
+        while batch := await _mark_batch(db, job, conditions):
+            marked += batch
+    
+    if job.total == 0:
+        job.status = JobStatus.COMPLETED
+        job.finished_at = datetime.utcnow()
+    
+    await db.commit()
+    # Filters match documents the caller never named; drop exactly what was marked
+    await document_cache.invalidate(*marked)
+    
+    if job.status == JobStatus.PENDING:
+        try:
+            # Publishing blocks on the broker; keep it off the event loop
+            await asyncio.to_thread(purge_deletion_job.delay, job.job_id)
+        except Exception as e:
+            # resume_deletion_jobs picks the job up once the broker is back
+            logger.error(f"Failed to enqueue deletion job {job.job_id}: {str(e)}")
+        await db.refresh(job)
+    
+    return DeletionJobResponse.model_validate(job)
+
+
+@router.get("/deletion-jobs/{job_id}", response_model=DeletionJobResponse)
+async def get_deletion_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get progress of a bulk deletion job
+    
+    - **job_id**: UUID returned by `POST /documents/bulk-delete`
+    """
+    job = await db.scalar(
+        select(DeletionJob).where(DeletionJob.job_id == str(job_id))
+    )
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "JOB_NOT_FOUND",
+                "message": f"Deletion job with ID {job_id} not found"
+            }
+        )
+    
+    return DeletionJobResponse.model_validate(job)
@@ -1,25 +1,174 @@
 """
 Documents Management Endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Header, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, delete, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import Optional
+from typing import Optional, Tuple, Union, Dict, Any, AsyncIterator
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote
+import asyncio
+import base64
+import contextlib
+import json
+import orjson
 
-from app.database import get_db
-from app.models.document import Document, DocumentStatus
-from app.schemas.document import DocumentResponse, DocumentListResponse
-from app.services.storage import storage_service
+from app.database import get_async_db
+from app.models.document import Document, DocumentStatus, DocumentChunk, ChunkLshBand
+from app.schemas.document import (
+    DocumentResponse, DocumentListResponse, DocumentStatsResponse, TotalMode,
+    BulkStatusRequest, BulkStatusResponse, BulkStatusCompactResponse,
+    DocumentStatusItem, StatusFormat
+)
+from app.services.storage import storage_service, FileRangeResponse
+from app.services.counters import status_counters
+from app.services.cache import document_cache
+from app.services.dedup import dedup_service
+from app.config import settings
 
 router = APIRouter()
 
+# Columns needed to render DocumentResponse; doc_metadata is opt-in
+DOCUMENT_COLUMNS = (
+    Document.upload_id,
+    Document.filename,
+    Document.file_type,
+    Document.file_size,
+    Document.status,
+    Document.created_at,
+    Document.updated_at,
+    Document.processed_at,
+    Document.chunk_count,
+    Document.error_message,
+)
 
-@router.get("/documents", response_model=DocumentListResponse)
+# Fields that can be requested through the fields= parameter
+OPTIONAL_FIELDS = {"doc_metadata": Document.doc_metadata}
+
+
+def _document_columns(fields: Optional[str]) -> tuple:
+    """Base columns plus any optional fields requested as a comma-separated list"""
+    requested = {field.strip() for field in (fields or "").split(",") if field.strip()}
+    unknown = requested - OPTIONAL_FIELDS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "INVALID_FIELDS",
+                "message": f"Unknown fields: {', '.join(sorted(unknown))}",
+                "allowed_fields": sorted(OPTIONAL_FIELDS)
+            }
+        )
+    return DOCUMENT_COLUMNS + tuple(
+        column for name, column in OPTIONAL_FIELDS.items() if name in requested
+    )
+
+
+def _document_row_to_dict(row, include_timings: bool = False) -> Dict[str, Any]:
+    """
+    Build a DocumentResponse-shaped dict straight from a selected row
+    
+    Trace timings live in doc_metadata["trace"] but are only returned,
+    as `timings`, when asked for.
+    """
+    data = row._asdict()
+    data["status"] = data["status"].value
+    data["chunk_count"] = data["chunk_count"] or 0
+    if "doc_metadata" in data:
+        data["doc_metadata"] = dict(data["doc_metadata"] or {})
+        trace = data["doc_metadata"].pop("trace", None)
+        if include_timings:
+            data["timings"] = trace
+    return data
+
+
+def _encode_cursor(created_at: datetime, upload_id: str) -> str:
+    """Build an opaque cursor pointing just past the given row"""
+    raw = json.dumps([created_at.isoformat(), upload_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by _encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, upload_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(UUID(upload_id))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "INVALID_CURSOR",
+                "message": "Cursor is malformed or was not issued by this API"
+            }
+        )
+
+
+async def _estimate_total(db: AsyncSession, status_filter: Optional[DocumentStatus]) -> int:
+    """Approximate total from the maintained per-status counters"""
+    counts = await db.run_sync(status_counters.get_counts)
+    if status_filter:
+        return counts[status_filter]
+    return sum(counts.values()) - counts[DocumentStatus.DELETING]
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def _not_modified(headers, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent"""
+    if "if-none-match" in headers:
+        return _etag_matches(headers["if-none-match"], etag)
+    try:
+        since = parsedate_to_datetime(headers["if-modified-since"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return int(mtime) <= since.timestamp()
+
+
+def _parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into a half-open (start, end)
+    
+    Returns None for headers to ignore (malformed, other units, or several
+    ranges, which are served as the full file). Raises ValueError when the
+    range lies outside the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first + last).isdigit():
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError(header)
+        return max(0, size - int(last)), size
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if start >= size or start >= end:
+        raise ValueError(header)
+    return start, end
+
+
+@router.get("/documents", response_model=DocumentListResponse, response_class=ORJSONResponse)
 async def list_documents(
     status_filter: Optional[DocumentStatus] = Query(None, alias="status"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    total_mode: TotalMode = Query(TotalMode.EXACT, alias="total"),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all uploaded documents with optional filtering
@@ -27,44 +176,244 @@ async def list_documents(
     - **status**: Filter by processing status (pending, processing, completed, failed)
     - **limit**: Maximum number of results (1-100, default 20)
     - **offset**: Number of results to skip (for pagination)
+    - **cursor**: Opaque `next_cursor` from a previous page; constant-time
+      alternative to offset, cannot be combined with it
+    - **total**: `exact` (default), `estimate` (read from the maintained
+      status counters, constant time) or `none` to skip counting entirely
+    - **fields**: Optional fields to include, e.g. `doc_metadata`
     """
-    query = db.query(Document)
+    if cursor and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "INVALID_PAGINATION",
+                "message": "Use either cursor or offset, not both"
+            }
+        )
+    if status_filter == DocumentStatus.DELETING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "INVALID_STATUS_FILTER",
+                "message": "Documents pending deletion are not listed; track them through their deletion job"
+            }
+        )
+    
+    columns = _document_columns(fields)
     
-    # Apply status filter
+    # Apply status filter; documents pending bulk deletion are hidden
     if status_filter:
-        query = query.filter(Document.status == status_filter)
+        conditions = [Document.status == status_filter]
+    else:
+        conditions = [Document.status != DocumentStatus.DELETING]
     
     # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    documents = query.order_by(
-        Document.created_at.desc()
-    ).limit(limit).offset(offset).all()
-    
-    return DocumentListResponse(
-        documents=[DocumentResponse.from_orm(doc) for doc in documents],
-        total=total,
-        limit=limit,
-        offset=offset
+    if total_mode == TotalMode.EXACT:
+        total = await db.scalar(
+            select(func.count()).select_from(Document).where(*conditions)
+        )
+    elif total_mode == TotalMode.ESTIMATE:
+        total = await _estimate_total(db, status_filter)
+    else:
+        total = None
+    
+    # Apply pagination; seek past the cursor instead of skipping rows
+    if cursor:
+        created_at, upload_id = _decode_cursor(cursor)
+        conditions.append(
+            tuple_(Document.created_at, Document.upload_id) < (created_at, upload_id)
+        )
+    
+    result = await db.execute(select(*columns).where(*conditions).order_by(
+        Document.created_at.desc(),
+        Document.upload_id.desc()
+    ).limit(limit + 1).offset(offset))
+    documents = result.all()
+    
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = _encode_cursor(last.created_at, last.upload_id)
+    
+    # Rows are rendered directly; the shape matches DocumentListResponse
+    return ORJSONResponse({
+        "documents": [_document_row_to_dict(row) for row in documents],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor
+    })
+
+
+@router.get("/documents/stats", response_model=DocumentStatsResponse)
+async def get_document_stats(db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the number of documents in each processing status
+    
+    Read from counters maintained on every status transition, so the cost
+    does not grow with the size of the documents table. Documents pending
+    deletion are counted under `deleting` but left out of `total`.
+    """
+    counts = await db.run_sync(status_counters.get_counts)
+    return DocumentStatsResponse(
+        counts={doc_status.value: count for doc_status, count in counts.items()},
+        total=sum(counts.values()) - counts[DocumentStatus.DELETING]
     )
 
 
+@router.post(
+    "/documents/status",
+    response_model=Union[BulkStatusResponse, BulkStatusCompactResponse]
+)
+async def get_document_statuses(
+    request: BulkStatusRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Look up the status of many documents in one call
+    
+    - **upload_ids**: Documents to look up (up to BULK_STATUS_MAX_IDS)
+    - **format**: `full` (list of objects) or `compact` (field names plus
+      one positional row per document)
+    
+    Only status columns are loaded. Unknown IDs are listed in `missing`.
+    Longer ID lists are rejected with 422 while the body is validated.
+    """
+    upload_ids = list(dict.fromkeys(str(upload_id) for upload_id in request.upload_ids))
+    
+    columns = (
+        Document.upload_id,
+        Document.status,
+        Document.chunk_count,
+        Document.processed_at,
+        Document.error_message,
+    )
+    rows = []
+    batch_size = settings.BULK_QUERY_BATCH_SIZE
+    for start in range(0, len(upload_ids), batch_size):
+        batch = upload_ids[start:start + batch_size]
+        result = await db.execute(select(*columns).where(Document.upload_id.in_(batch)))
+        rows.extend(result.all())
+    
+    found = {row.upload_id for row in rows}
+    missing = [upload_id for upload_id in upload_ids if upload_id not in found]
+    
+    if request.format == StatusFormat.COMPACT:
+        response = BulkStatusCompactResponse(
+            fields=[column.key for column in columns],
+            rows=[
+                [
+                    row.upload_id,
+                    row.status.value,
+                    row.chunk_count or 0,
+                    row.processed_at.isoformat() if row.processed_at else None,
+                    row.error_message,
+                ]
+                for row in rows
+            ],
+            missing=missing
+        )
+    else:
+        response = BulkStatusResponse(
+            documents=[
+                DocumentStatusItem(
+                    upload_id=row.upload_id,
+                    status=row.status.value,
+                    chunk_count=row.chunk_count or 0,
+                    processed_at=row.processed_at,
+                    error_message=row.error_message
+                )
+                for row in rows
+            ],
+            missing=missing
+        )
+    
+    return Response(content=response.model_dump_json(), media_type="application/json")
+
+
 @router.get("/documents/{upload_id}", response_model=DocumentResponse)
 async def get_document(
     upload_id: UUID,
-    db: Session = Depends(get_db)
+    timings: bool = Query(False),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get details of a specific document
     
     - **upload_id**: UUID of the uploaded document
+    - **timings**: Include the trace id and per-stage durations (ms) recorded
+      from upload through processing
+    
+    Responses carry an ETag; send it back in If-None-Match to get an empty
+    304 while the document is unchanged.
     """
-    document = db.query(Document).filter(
-        Document.upload_id == upload_id
-    ).first()
+    # Timing breakdowns are a diagnostic view and bypass the cache
+    payload, generation = (None, None) if timings else await document_cache.get(upload_id)
     
-    if not document:
+    if payload is None:
+        result = await db.execute(
+            select(*DOCUMENT_COLUMNS, Document.doc_metadata)
+            .where(Document.upload_id == str(upload_id))
+        )
+        document = result.first()
+        
+        if not document or document.status == DocumentStatus.DELETING:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "error": "DOCUMENT_NOT_FOUND",
+                    "message": f"Document with ID {upload_id} not found"
+                }
+            )
+        
+        payload = orjson.dumps(_document_row_to_dict(document, include_timings=timings)).decode()
+        await document_cache.set(upload_id, payload, generation)
+    
+    etag = document_cache.etag(payload)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+async def _closing_files() -> AsyncIterator[contextlib.ExitStack]:
+    """
+    Close files registered by the handler once the request is over
+    
+    Dependency teardown runs after the response has been sent, and also
+    when it never is (an exception, or a client that disconnected first).
+    """
+    with contextlib.ExitStack() as stack:
+        yield stack
+
+
+@router.get("/documents/{upload_id}/file", response_class=Response)
+@router.head("/documents/{upload_id}/file", response_class=Response, include_in_schema=False)
+async def download_document_file(
+    upload_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    open_files: contextlib.ExitStack = Depends(_closing_files)
+):
+    """
+    Download the original uploaded file
+    
+    - **upload_id**: UUID of the uploaded document
+    
+    Supports single byte ranges (`Range: bytes=start-end`, 206 Partial
+    Content) guarded by If-Range, and ETag/Last-Modified revalidation
+    (If-None-Match, If-Modified-Since). The file is streamed from storage
+    without being loaded into memory.
+    """
+    result = await db.execute(
+        select(Document.filename, Document.file_type, Document.file_path, Document.status)
+        .where(Document.upload_id == str(upload_id))
+    )
+    document = result.first()
+    if not document or document.status == DocumentStatus.DELETING:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -73,22 +422,74 @@ async def get_document(
             }
         )
     
-    return DocumentResponse.from_orm(document)
+    opened = await storage_service.open_file(document.file_path)
+    if opened is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "FILE_NOT_FOUND",
+                "message": f"Stored file for document {upload_id} is missing"
+            }
+        )
+    file, stat_result = opened
+    open_files.enter_context(file)
+    
+    size = stat_result.st_size
+    etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+    }
+    if _not_modified(request.headers, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    start, end, status_code = 0, size, status.HTTP_200_OK
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if range_header and (if_range is None or if_range in (etag, last_modified)):
+        try:
+            byte_range = _parse_byte_range(range_header, size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail={
+                    "error": "RANGE_NOT_SATISFIABLE",
+                    "message": f"Range {range_header} is outside the {size} byte file"
+                },
+                headers={"Content-Range": f"bytes */{size}"}
+            )
+        if byte_range:
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    
+    headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(document.filename)}"
+    return FileRangeResponse(
+        file, start, end - start,
+        status_code=status_code,
+        headers=headers,
+        media_type=document.file_type,
+        send_body=request.method != "HEAD"
+    )
 
 
 @router.delete("/documents/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     upload_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a document and its associated files
     
     - **upload_id**: UUID of the document to delete
     """
-    document = db.query(Document).filter(
-        Document.upload_id == upload_id
-    ).first()
+    document = await db.scalar(
+        select(Document).where(Document.upload_id == str(upload_id))
+    )
     
     if not document:
         raise HTTPException(
@@ -99,11 +500,16 @@ async def delete_document(
             }
         )
     
-    # Delete file from storage
-    storage_service.delete_file(document.file_path)
+    # Delete file from storage (unlink and rmdir block on disk)
+    await asyncio.to_thread(storage_service.delete_file, document.file_path)
     
-    # Delete database record
-    db.delete(document)
-    db.commit()
+    # Delete database record and its chunks
+    await db.run_sync(status_counters.adjust, {document.status: -1})
+    await db.run_sync(dedup_service.release, [document.upload_id])
+    await db.execute(delete(ChunkLshBand).where(ChunkLshBand.upload_id == document.upload_id))
+    await db.execute(delete(DocumentChunk).where(DocumentChunk.upload_id == document.upload_id))
+    await db.delete(document)
+    await db.commit()
+    await document_cache.invalidate(upload_id)
     
     return None
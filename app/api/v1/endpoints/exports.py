@@ -0,0 +1,77 @@
+"""
+Export Endpoints
+Bulk chunk export for downstream embedding and indexing jobs
+"""
+from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+from app.database import get_async_db
+from app.models.document import DocumentStatus
+from app.schemas.export import ExportFormat
+from app.services.export import export_service, ExportFormatUnavailable, MEDIA_TYPES
+
+router = APIRouter()
+
+
+@router.get("/exports/chunks")
+async def export_chunks(
+    fmt: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    status_filter: DocumentStatus = Query(DocumentStatus.COMPLETED, alias="status"),
+    processed_after: Optional[datetime] = Query(None),
+    after_upload_id: Optional[UUID] = Query(None),
+    processed_before: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream every stored chunk of the matching documents
+    
+    - **format**: `ndjson` (default), `arrow` (Arrow IPC stream) or `parquet`;
+      the columnar formats need pyarrow on the server
+    - **status**: Document status to export (default completed)
+    - **processed_after**: Only documents processed at or after this time
+    - **after_upload_id**: With processed_after, resume strictly after this
+      document; pass the last row's `processed_at` and `upload_id` to
+      continue a previous export without repeating or skipping documents
+    - **processed_before**: Only documents processed at or before this time
+    
+    Rows are ordered by (processed_at, upload_id, chunk_index) and read
+    through a server-side cursor, so the export never has to fit in memory.
+    Documents processed in the last EXPORT_SETTLE_SECONDS are left for the
+    next export, so ones still committing are not skipped.
+    """
+    if after_upload_id is not None and processed_after is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "INVALID_EXPORT_CURSOR",
+                "message": "after_upload_id requires processed_after"
+            }
+        )
+    try:
+        encoder = export_service.encoder(fmt)
+    except ExportFormatUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "FORMAT_UNAVAILABLE",
+                "message": str(e)
+            }
+        )
+    
+    body = export_service.stream_export(
+        db, encoder,
+        doc_status=status_filter,
+        processed_after=processed_after,
+        after_upload_id=str(after_upload_id) if after_upload_id else None,
+        processed_before=processed_before
+    )
+    filename = f"chunks-{status_filter.value}.{fmt.value}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -3,16 +3,27 @@ Upload Endpoint
 Handles document upload and ingestion
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
 from datetime import datetime
+import asyncio
+import logging
+import time
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.document import Document, DocumentStatus
 from app.schemas.document import DocumentUploadResponse
 from app.services.storage import storage_service
+from app.services.counters import status_counters
+from app.services.metrics import (
+    UPLOAD_BYTES, UPLOAD_LATENCY, SAVE_FILE_DURATION, DB_COMMIT_DURATION
+)
+from app.services.tracing import Trace, SPAN_KIND_SERVER
+from app.tasks.celery_app import celery_app
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Allowed MIME types
@@ -24,11 +35,14 @@ ALLOWED_TYPES = {
 
 MAX_FILE_SIZE = settings.MAX_FILE_SIZE
 
+# Sent by name so the API does not import the worker's parsing stack
+PROCESS_DOCUMENT_TASK = "app.tasks.processing.process_document"
+
 
 @router.post("/upload", response_model=DocumentUploadResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload a document for processing
@@ -40,6 +54,7 @@ async def upload_document(
     - status: Initial status (pending)
     - message: Success message
     """
+    started = time.perf_counter()
     
     # 1. Validate file type
     if file.content_type not in ALLOWED_TYPES:
@@ -89,29 +104,58 @@ async def upload_document(
     
     # 4. Generate unique upload_id
     upload_id = uuid4()
+    file_path = None
+    trace = Trace()
+    upload_span = trace.start_span(
+        "upload", kind=SPAN_KIND_SERVER,
+        **{"document.upload_id": str(upload_id), "document.size": file_size}
+    )
     
     try:
         # 5. Save file to storage
-        file_path = await storage_service.save_file(upload_id, file)
+        with SAVE_FILE_DURATION.time(), trace.span("save_file"):
+            file_path = await storage_service.save_file(upload_id, file)
         
         # 6. Create database record
         document = Document(
-            upload_id=upload_id,
+            upload_id=str(upload_id),
             filename=file.filename,
             file_type=file.content_type,
             file_size=file_size,
             file_path=file_path,
             status=DocumentStatus.PENDING,
             created_at=datetime.utcnow(),
-            doc_metadata={}
+            doc_metadata=trace.annotate({})
         )
         
         db.add(document)
-        db.commit()
-        db.refresh(document)
+        await db.run_sync(status_counters.adjust, {DocumentStatus.PENDING: 1})
+        with DB_COMMIT_DURATION.labels(operation="upload").time(), trace.span("commit_upload"):
+            await db.commit()
         
-        # 7. Trigger async processing via Celery
-       # process_document.delay(str(upload_id))
+        # 7. Trigger async processing via Celery; the trace continues in the worker,
+        # which stores the upload spans finished after the insert (commit_upload)
+        # so the upload path makes no second write
+        try:
+            # Publishing blocks on the broker; keep it off the event loop
+            with trace.span("enqueue"):
+                await asyncio.to_thread(
+                    celery_app.send_task,
+                    PROCESS_DOCUMENT_TASK,
+                    args=[str(upload_id)],
+                    headers={
+                        "trace_id": trace.trace_id,
+                        "parent_span_id": upload_span.span_id,
+                        "upload_timings": trace.timings(),
+                        "enqueued_ns": time.time_ns(),
+                    }
+                )
+        except Exception as e:
+            logger.error(f"Failed to enqueue document {upload_id}: {str(e)}")
+        
+        UPLOAD_BYTES.observe(file_size)
+        UPLOAD_LATENCY.observe(time.perf_counter() - started)
+        trace.end_span(upload_span)
         
         # 8. Return response
         return DocumentUploadResponse(
@@ -125,7 +169,10 @@ async def upload_document(
         
     except Exception as e:
         # Cleanup on error
-        db.rollback()
+        trace.end_span(upload_span, e)
+        await db.rollback()
+        if file_path:
+            await asyncio.to_thread(storage_service.delete_file, file_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
@@ -133,3 +180,6 @@ async def upload_document(
                 "message": f"Failed to upload document: {str(e)}"
             }
         )
+    
+    finally:
+        trace.export()
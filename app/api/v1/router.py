@@ -3,10 +3,13 @@ API v1 Router
 Combines all endpoint routers
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import upload, documents
+from app.api.v1.endpoints import upload, documents, deletions, exports, admin
 
 api_router = APIRouter()
 
 # Include endpoint routers
 api_router.include_router(upload.router, tags=["Upload"])
 api_router.include_router(documents.router, tags=["Documents"])
+api_router.include_router(deletions.router, tags=["Deletions"])
+api_router.include_router(exports.router, tags=["Exports"])
+api_router.include_router(admin.router, tags=["Admin"])
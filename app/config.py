@@ -1,6 +1,7 @@
 """
 Application Configuration
 """
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -9,17 +10,99 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./rag.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_CREATE_TABLES_ON_STARTUP: bool = False  # otherwise run scripts/init_db.py
+    
+    # SQLite profile
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 256MB
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB, i.e. 64MB
+    
+    # PostgreSQL profile
+    PG_STATEMENT_TIMEOUT_MS: int = 30000
+    PG_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # 0 disables (PgBouncer)
+    PG_APPLICATION_NAME: str = "rag-ingestion"
+    
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Document cache ("redis", "memory" or "none")
+    DOCUMENT_CACHE_BACKEND: str = "redis"
+    DOCUMENT_CACHE_TTL: int = 60  # seconds
+    CACHE_SOCKET_TIMEOUT: float = 0.25  # seconds
+    
+    # Maintenance
+    STATUS_COUNT_RECONCILE_INTERVAL: int = 300  # seconds
+    GC_INTERVAL: int = 3600  # seconds
+    GC_ORPHAN_GRACE_PERIOD: int = 3600  # seconds before an unreferenced upload dir is removed
+    GC_RETENTION_DAYS: Dict[str, int] = {"failed": 30}  # status -> max age; absent = keep
+    
     # File Storage
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     
+    # Upload admission control (0 disables a limit)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_QUEUE_DEPTH: int = 10000  # pending + processing documents
+    ADMISSION_MAX_INFLIGHT_BYTES: int = 512 * 1024 * 1024  # per API process
+    ADMISSION_MIN_FREE_BYTES: int = 1024 * 1024 * 1024  # kept free in UPLOAD_DIR
+    ADMISSION_CLIENT_RATE: float = 0.0  # uploads per second per client
+    ADMISSION_CLIENT_BURST: int = 20
+    ADMISSION_CLIENT_HEADER: str = ""  # e.g. "X-API-Key"; client IP when empty
+    ADMISSION_REFRESH_INTERVAL: float = 1.0  # seconds between queue/disk samples
+    ADMISSION_MAX_RETRY_AFTER: int = 300  # seconds
+    
+    # Bulk operations
+    BULK_STATUS_MAX_IDS: int = 10000
+    BULK_DELETE_MAX_IDS: int = 10000
+    BULK_QUERY_BATCH_SIZE: int = 500  # ids per IN clause
+    DELETION_BATCH_SIZE: int = 500  # documents purged per batch
+    DELETION_BATCH_DELAY: float = 0.1  # seconds between purge batches
+    DELETION_STALE_AFTER: int = 600  # seconds before an idle job is resumed
+    EXPORT_BATCH_SIZE: int = 1000  # chunk rows fetched and encoded per partition
+    EXPORT_SETTLE_SECONDS: int = 60  # newer documents wait for the next export
+    
+    # Near-duplicate chunk detection (MinHash/LSH); changing NUM_PERM, BANDS or
+    # SHINGLE_SIZE invalidates stored signatures, so reprocess after doing so
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8  # estimated Jaccard similarity to flag a duplicate
+    DEDUP_NUM_PERM: int = 128  # MinHash signature length
+    DEDUP_BANDS: int = 16  # LSH bands; must divide DEDUP_NUM_PERM
+    DEDUP_SHINGLE_SIZE: int = 5  # words per shingle
+    
+    # Readiness (/ready)
+    READY_CACHE_TTL: float = 2.0  # seconds a readiness report is reused
+    READY_PROBE_TIMEOUT: float = 1.0  # seconds per dependency probe
+    READY_MIN_FREE_BYTES: int = 1024 * 1024 * 1024  # 1GB free in UPLOAD_DIR
+    READY_REQUIRED_PROBES: List[str] = ["database", "broker", "storage"]  # "workers" is informational
+    
+    # Workers
+    WORKER_PRELOAD_PARSERS: bool = True  # import PDF/DOCX parsers before forking
+    
+    # Metrics
+    WORKER_METRICS_PORT: int = 9808  # 0 disables the Celery worker exporter
+    
+    # Tracing
+    TRACE_EXPORT_PATH: str = ""  # OTLP/JSON lines file; empty disables export
+    TRACE_SERVICE_NAME: str = "rag-ingestion"
+    
+    # Profiling (opt-in)
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of requests/tasks profiled
+    PROFILE_HEADER: str = "X-Profile"  # forces a profile for this request
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_FILES: int = 50  # oldest profiles are evicted beyond this
+    
     API_V1_PREFIX: str = "/api/v1"
     DEBUG: bool = False
     
     SECRET_KEY: str = "your-secret-key-change-in-production"
+    ADMIN_TOKEN: Optional[str] = None  # required by /admin endpoints; unset disables them
     
     class Config:
         env_file = ".env"
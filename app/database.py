@@ -1,20 +1,163 @@
 """
 Database Connection and Session Management
 """
-from sqlalchemy import create_engine
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import settings
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False
-)
+# Async drivers used by the API for each sync driver in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Translate a sync database URL to its async-driver equivalent"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql":
+        # SQLAlchemy's asyncpg adapter keeps prepared statements per connection;
+        # 0 disables them (needed behind PgBouncer in transaction mode)
+        parsed = parsed.update_query_dict({
+            "prepared_statement_cache_size": str(settings.PG_PREPARED_STATEMENT_CACHE_SIZE)
+        })
+    return parsed.render_as_string(hide_password=False)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning, applied when the pool opens a connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _sqlite_profile(parsed) -> dict:
+    """
+    SQLite: WAL so API readers and worker writers stop blocking each other,
+    synchronous=NORMAL (durable across app crashes, cheaper fsyncs), and a
+    busy timeout instead of immediate "database is locked" errors.
+    
+    aiosqlite defaults to opening a connection (and thread) per checkout,
+    so file-backed databases get an explicit queue pool. In-memory SQLite
+    keeps its single shared connection.
+    """
+    options = {"connect_listeners": [_set_sqlite_pragmas]}
+    if parsed.database in (None, "", ":memory:"):
+        return options
+    options.update({
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    })
+    if parsed.get_dialect().is_async:
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+
+def _postgres_profile(parsed) -> dict:
+    """PostgreSQL: sized pool with liveness checks and a server-side statement timeout"""
+    server_settings = {
+        "statement_timeout": str(settings.PG_STATEMENT_TIMEOUT_MS),
+        "application_name": settings.PG_APPLICATION_NAME,
+    }
+    if parsed.get_dialect().is_async:
+        connect_args = {"server_settings": server_settings}
+    else:
+        connect_args = {
+            "options": " ".join(f"-c {key}={value}" for key, value in server_settings.items())
+        }
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
+
+def engine_options(url: str) -> dict:
+    """
+    Backend-specific create_engine keyword arguments for a database URL
+    
+    Connect-time hooks are returned under "connect_listeners"; pass the
+    result through create_engine_from_profile (or create_async_engine_from_profile)
+    rather than straight to create_engine.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return _sqlite_profile(parsed)
+    if backend == "postgresql":
+        return _postgres_profile(parsed)
+    return {"pool_pre_ping": True}
+
+
+def create_engine_from_profile(url: str, **overrides):
+    """Create a sync engine tuned for its backend"""
+    options = {**engine_options(url), **overrides}
+    listeners = options.pop("connect_listeners", [])
+    new_engine = create_engine(url, **options)
+    for listener in listeners:
+        event.listen(new_engine, "connect", listener)
+    return new_engine
+
+
+def create_async_engine_from_profile(url: str, **overrides):
+    """Create an async engine tuned for its backend"""
+    options = {**engine_options(url), **overrides}
+    listeners = options.pop("connect_listeners", [])
+    new_engine = create_async_engine(url, **options)
+    for listener in listeners:
+        event.listen(new_engine.sync_engine, "connect", listener)
+    return new_engine
+
+
+# Create database engine (Celery workers and scripts)
+engine = create_engine_from_profile(settings.DATABASE_URL, echo=False)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+@lru_cache(maxsize=None)
+def get_async_engine():
+    """
+    Async database engine (API request handlers), created on first use
+    
+    Workers and scripts import this module too; they never touch the async
+    engine, so they keep working on backends without an async driver.
+    """
+    return create_async_engine_from_profile(
+        async_database_url(settings.DATABASE_URL),
+        echo=False
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Session factory bound to get_async_engine()"""
+    return async_sessionmaker(
+        get_async_engine(),
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
 Base = declarative_base()
 
 
@@ -30,6 +173,15 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency for getting an async database session
+    Usage: db: AsyncSession = Depends(get_async_db)
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
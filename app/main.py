@@ -1,13 +1,20 @@
 """
 Main FastAPI Application
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Response, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from app.config import settings
 from app.api.v1.router import api_router
+from app.api.v1.endpoints.admin import require_admin
 from app.database import init_db
+from app.services.metrics import render_latest
+from app.services.profiler import ProfilingMiddleware
+from app.services.readiness import readiness_service
+from app.services.admission import AdmissionMiddleware
 
 
 @asynccontextmanager
@@ -15,8 +22,9 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     print("🚀 Starting RAG Document Ingestion Service...")
-    init_db()
-    print("✅ Database initialized")
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        init_db()
+        print("✅ Database initialized")
     yield
     # Shutdown
     print("👋 Shutting down...")
@@ -30,7 +38,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# CORS middleware
+# Middleware added last runs first
+
+# Backpressure on uploads, applied before the body is read
+app.add_middleware(AdmissionMiddleware, path=f"{settings.API_V1_PREFIX}/upload")
+
+# Opt-in request profiling (PROFILING_ENABLED)
+app.add_middleware(ProfilingMiddleware)
+
+# CORS middleware, outermost so rejected uploads (429/503) carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure properly in production
@@ -45,7 +61,7 @@ app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness endpoint; does not check dependencies (see /ready)"""
     return {
         "status": "healthy",
         "service": "RAG Document Ingestion",
@@ -53,11 +69,39 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check(fresh: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    Readiness endpoint
+    
+    Probes the database pool, Redis broker, upload storage free space and
+    Celery workers concurrently and reports each one's latency. Returns 503
+    when a probe listed in READY_REQUIRED_PROBES fails. Reports are cached
+    for READY_CACHE_TTL seconds; `fresh=true` forces a new check and, as it
+    pings every worker, needs the X-Admin-Token header.
+    """
+    if fresh:
+        require_admin(x_admin_token)
+    report = await readiness_service.check(force=fresh)
+    status_code = status.HTTP_200_OK if report["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(report, status_code=status_code)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(
+        content=render_latest(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
     return {
         "message": "RAG Document Ingestion API",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
@@ -1,5 +1,8 @@
 
-from sqlalchemy import Column, String, Integer, DateTime, Enum, Text, JSON
+from sqlalchemy import (
+    Column, String, Integer, SmallInteger, BigInteger, Float, DateTime, Enum, Text, JSON,
+    LargeBinary, Index, ForeignKey
+)
 from datetime import datetime
 import uuid
 import enum
@@ -13,6 +16,7 @@ class DocumentStatus(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    DELETING = "deleting"
 
 
 class Document(Base):
@@ -36,6 +40,81 @@ class Document(Base):
     doc_metadata = Column(JSON, default=dict)
     error_message = Column(Text, nullable=True)
     
+    # Set when a bulk deletion job has claimed the row
+    deletion_job_id = Column(String(36), nullable=True, index=True)
+    
+    # Keyset pagination walks (created_at DESC, upload_id DESC), optionally
+    # restricted to a single status; chunk exports walk processed_at per status
+    __table_args__ = (
+        Index("ix_documents_status_created_at", "status", "created_at", "upload_id"),
+        Index("ix_documents_created_at", "created_at", "upload_id"),
+        Index("ix_documents_status_processed_at", "status", "processed_at", "upload_id"),
+    )
+    
     def __repr__(self):
         return f"<Document {self.filename} ({self.status})>"
 
+
+class DocumentChunk(Base):
+    """
+    A chunk of a processed document's text, in reading order
+    
+    Near-duplicates of an earlier chunk point at it through duplicate_of_*
+    so its embedding can be reused. When the original is deleted, one of its
+    duplicates takes its place (see DedupService.release).
+    """
+    __tablename__ = "document_chunks"
+    
+    upload_id = Column(String(36), ForeignKey("documents.upload_id", ondelete="CASCADE"), primary_key=True)
+    chunk_index = Column(Integer, primary_key=True)
+    content = Column(Text, nullable=False)
+    word_count = Column(Integer, nullable=False)
+    start_word = Column(Integer, nullable=False)
+    end_word = Column(Integer, nullable=False)
+    
+    # MinHash signature (DEDUP_NUM_PERM little-endian uint32 values) and dedup verdict
+    minhash = Column(LargeBinary, nullable=True)
+    duplicate_of_upload_id = Column(String(36), nullable=True)
+    duplicate_of_chunk_index = Column(Integer, nullable=True)
+    duplicate_similarity = Column(Float, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_document_chunks_duplicate_of", "duplicate_of_upload_id", "duplicate_of_chunk_index"),
+    )
+    
+    def __repr__(self):
+        return f"<DocumentChunk {self.upload_id}#{self.chunk_index}>"
+
+
+class ChunkLshBand(Base):
+    """
+    LSH index over the MinHash signatures of non-duplicate chunks
+    
+    A chunk sharing any (band_index, band_hash) with another is a
+    near-duplicate candidate; the primary key doubles as the lookup index.
+    """
+    __tablename__ = "chunk_lsh_bands"
+    
+    band_index = Column(SmallInteger, primary_key=True)
+    band_hash = Column(BigInteger, primary_key=True)
+    upload_id = Column(String(36), ForeignKey("documents.upload_id", ondelete="CASCADE"), primary_key=True)
+    chunk_index = Column(Integer, primary_key=True)
+    
+    __table_args__ = (
+        Index("ix_chunk_lsh_bands_upload_id", "upload_id"),
+    )
+    
+    def __repr__(self):
+        return f"<ChunkLshBand {self.band_index}:{self.band_hash} {self.upload_id}#{self.chunk_index}>"
+
+
+class DocumentStatusCount(Base):
+    """Number of documents currently in each status, maintained on every transition"""
+    __tablename__ = "document_status_counts"
+    
+    status = Column(Enum(DocumentStatus), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<DocumentStatusCount {self.status}={self.count}>"
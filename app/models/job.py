@@ -0,0 +1,39 @@
+
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Enum, Text, JSON
+from datetime import datetime
+import uuid
+import enum
+
+from app.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    """Background job status"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class DeletionJob(Base):
+    """Bulk deletion job: rows are marked up front, files and rows purged in batches"""
+    __tablename__ = "deletion_jobs"
+    
+    job_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
+    criteria = Column(JSON, default=dict)
+    
+    # Progress
+    total = Column(Integer, default=0, nullable=False)
+    processed = Column(Integer, default=0, nullable=False)
+    bytes_freed = Column(BigInteger, default=0, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    
+    error_message = Column(Text, nullable=True)
+    
+    def __repr__(self):
+        return f"<DeletionJob {self.job_id} ({self.status})>"
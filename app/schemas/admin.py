@@ -0,0 +1,19 @@
+"""
+Pydantic Schemas for Admin Endpoints
+"""
+from pydantic import BaseModel
+from typing import List
+
+
+class ProfileInfo(BaseModel):
+    """A captured profile in the on-disk ring"""
+    name: str
+    kind: str  # "request" or "task"
+    created_at: float  # unix timestamp
+    size: int
+
+
+class ProfileListResponse(BaseModel):
+    """Response schema for listing captured profiles"""
+    profiles: List[ProfileInfo]
+    max_profiles: int
@@ -2,9 +2,20 @@
 Pydantic Schemas for Request/Response Validation
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from uuid import UUID
+import enum
+
+from app.models.document import DocumentStatus
+from app.config import settings
+
+
+class TotalMode(str, enum.Enum):
+    """How the document listing computes its total"""
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
 
 
 class DocumentUploadResponse(BaseModel):
@@ -20,6 +31,12 @@ class DocumentUploadResponse(BaseModel):
         from_attributes = True
 
 
+class DocumentTimings(BaseModel):
+    """Per-stage durations recorded along a document's trace"""
+    trace_id: str
+    spans: Dict[str, float] = {}  # span name -> duration in ms
+
+
 class DocumentResponse(BaseModel):
     """Response schema for document details"""
     upload_id: UUID
@@ -33,17 +50,98 @@ class DocumentResponse(BaseModel):
     chunk_count: int = 0
     doc_metadata: Dict[str, Any] = {}
     error_message: Optional[str] = None
+    timings: Optional[DocumentTimings] = None  # only with ?timings=true
     
     class Config:
         from_attributes = True
 
 
+class DocumentListItem(BaseModel):
+    """A document as listed: doc_metadata only when requested through fields="""
+    upload_id: UUID
+    filename: str
+    file_type: str
+    file_size: int
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    processed_at: Optional[datetime] = None
+    chunk_count: int = 0
+    doc_metadata: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+
+
 class DocumentListResponse(BaseModel):
     """Response schema for document listing"""
-    documents: list[DocumentResponse]
-    total: int
+    documents: list[DocumentListItem]
+    total: Optional[int] = None
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
+
+
+class DocumentStatsResponse(BaseModel):
+    """Response schema for per-status document counts"""
+    counts: Dict[str, int]
+    total: int
+
+
+class StatusFormat(str, enum.Enum):
+    """Shape of the bulk status response"""
+    FULL = "full"
+    COMPACT = "compact"
+
+
+class BulkStatusRequest(BaseModel):
+    """Request schema for bulk status lookup"""
+    upload_ids: List[UUID] = Field(..., min_length=1, max_length=settings.BULK_STATUS_MAX_IDS)
+    format: StatusFormat = StatusFormat.FULL
+
+
+class DocumentStatusItem(BaseModel):
+    """Status fields of a single document"""
+    upload_id: UUID
+    status: str
+    chunk_count: int = 0
+    processed_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+
+
+class BulkStatusResponse(BaseModel):
+    """Response schema for bulk status lookup"""
+    documents: List[DocumentStatusItem]
+    missing: List[UUID] = []
+
+
+class BulkStatusCompactResponse(BaseModel):
+    """Compact bulk status response: one positional row per document"""
+    fields: List[str]
+    rows: List[List[Any]]
+    missing: List[UUID] = []
+
+
+class BulkDeleteRequest(BaseModel):
+    """Request schema for bulk deletion; criteria are combined with AND"""
+    upload_ids: Optional[List[UUID]] = Field(None, max_length=settings.BULK_DELETE_MAX_IDS)
+    status: Optional[DocumentStatus] = None
+    created_before: Optional[datetime] = None
+
+
+class DeletionJobResponse(BaseModel):
+    """Response schema for bulk deletion job progress"""
+    job_id: UUID
+    status: str
+    criteria: Dict[str, Any] = {}
+    total: int = 0
+    processed: int = 0
+    bytes_freed: int = 0
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,11 @@
+"""
+Pydantic Schemas for Export Endpoints
+"""
+import enum
+
+
+class ExportFormat(str, enum.Enum):
+    """Encoding of a chunk export"""
+    NDJSON = "ndjson"
+    ARROW = "arrow"  # Arrow IPC stream
+    PARQUET = "parquet"
@@ -0,0 +1,240 @@
+"""
+Upload Admission Control
+Backpressure for POST /upload before the request body is read
+
+Uploads are refused, with a Retry-After header, when
+- the client has used up its token bucket (429),
+- the processing backlog (pending + processing) is too deep (503),
+- this process is already receiving too many bytes (503), or
+- accepting the upload would leave too little free space in UPLOAD_DIR (503).
+
+Queue depth and disk usage are sampled at most every
+ADMISSION_REFRESH_INTERVAL seconds, so an admitted upload costs no extra
+database round trip. Token buckets and in-flight bytes are per process;
+limits apply to each API worker separately.
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.models.document import DocumentStatus
+from app.services.storage import storage_service
+from app.services.metrics import (
+    ADMISSION_REJECTED, ADMISSION_INFLIGHT_BYTES, ADMISSION_QUEUE_DEPTH, ADMISSION_LIMIT
+)
+
+logger = logging.getLogger(__name__)
+
+# Buckets kept before idle ones are dropped
+MAX_TRACKED_CLIENTS = 10000
+
+# Retry-After when the drain rate has not been measured yet
+DEFAULT_RETRY_AFTER = 30
+
+
+class Rejection(Exception):
+    """An upload refused by admission control"""
+    
+    def __init__(self, status_code: int, error: str, message: str, retry_after: float):
+        super().__init__(message)
+        self.status_code = status_code
+        self.error = error
+        self.message = message
+        self.retry_after = max(1, min(settings.ADMISSION_MAX_RETRY_AFTER, math.ceil(retry_after)))
+
+
+class AdmissionController:
+    """Decide whether an upload may start, and track the bytes it holds"""
+    
+    def __init__(self):
+        self.inflight_bytes = 0
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # client -> (tokens, updated)
+        self._queue_depth = 0
+        self._drain_rate: Optional[float] = None  # documents finished per second
+        self._finished: Optional[Tuple[float, int]] = None  # (sampled at, finished total)
+        self._free_bytes: Optional[int] = None
+        self._sampled_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+    
+    def publish_limits(self) -> None:
+        """Expose configured limits as gauges"""
+        limits = {
+            "max_queue_depth": settings.ADMISSION_MAX_QUEUE_DEPTH,
+            "max_inflight_bytes": settings.ADMISSION_MAX_INFLIGHT_BYTES,
+            "min_free_bytes": settings.ADMISSION_MIN_FREE_BYTES,
+            "client_rate": settings.ADMISSION_CLIENT_RATE,
+            "client_burst": settings.ADMISSION_CLIENT_BURST,
+        }
+        for name, value in limits.items():
+            ADMISSION_LIMIT.labels(limit=name).set(value)
+    
+    def take_token(self, client: str) -> None:
+        """Spend one token from the client's bucket or raise a 429 rejection"""
+        rate = settings.ADMISSION_CLIENT_RATE
+        if rate <= 0:
+            return
+        burst = settings.ADMISSION_CLIENT_BURST
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(client, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            raise Rejection(
+                429, "RATE_LIMITED",
+                f"Upload rate limit of {rate:g}/s (burst {burst}) exceeded",
+                (1 - tokens) / rate
+            )
+        self._buckets[client] = (tokens - 1, now)
+        if len(self._buckets) > MAX_TRACKED_CLIENTS:
+            self._prune_buckets(now)
+    
+    def _prune_buckets(self, now: float) -> None:
+        """Forget clients whose buckets have refilled; they are back to full anyway"""
+        refill = settings.ADMISSION_CLIENT_BURST / settings.ADMISSION_CLIENT_RATE
+        self._buckets = {
+            client: bucket for client, bucket in self._buckets.items()
+            if now - bucket[1] < refill
+        }
+    
+    async def refresh(self) -> None:
+        """Re-sample queue depth, drain rate and free space once per interval"""
+        if time.monotonic() - self._sampled_at < settings.ADMISSION_REFRESH_INTERVAL:
+            return
+        async with self._refresh_lock:
+            now = time.monotonic()
+            if now - self._sampled_at < settings.ADMISSION_REFRESH_INTERVAL:
+                return
+            self._sampled_at = now
+            try:
+                counts = await self._read_counts()
+            except Exception as e:
+                # Keep the last sample; admission must not depend on the DB being up
+                logger.warning(f"Admission control could not read status counts: {str(e)}")
+            else:
+                self._queue_depth = counts[DocumentStatus.PENDING] + counts[DocumentStatus.PROCESSING]
+                self._update_drain_rate(now, counts[DocumentStatus.COMPLETED] + counts[DocumentStatus.FAILED])
+                ADMISSION_QUEUE_DEPTH.set(self._queue_depth)
+            usage = await asyncio.to_thread(storage_service.disk_usage)
+            self._free_bytes = usage.free
+    
+    async def _read_counts(self) -> Dict[DocumentStatus, int]:
+        from app.database import get_async_sessionmaker
+        from app.services.counters import status_counters
+        
+        async with get_async_sessionmaker()() as db:
+            return await db.run_sync(status_counters.get_counts)
+    
+    def _update_drain_rate(self, now: float, finished: int) -> None:
+        """Exponentially smoothed documents-finished-per-second"""
+        if self._finished is not None:
+            elapsed = now - self._finished[0]
+            rate = max(0, finished - self._finished[1]) / elapsed if elapsed > 0 else 0
+            self._drain_rate = rate if self._drain_rate is None else 0.7 * self._drain_rate + 0.3 * rate
+        self._finished = (now, finished)
+    
+    def check_capacity(self, nbytes: int) -> None:
+        """Raise a 503 rejection if the backlog, memory or disk has no room"""
+        max_depth = settings.ADMISSION_MAX_QUEUE_DEPTH
+        if max_depth and self._queue_depth >= max_depth:
+            excess = self._queue_depth - max_depth + 1
+            retry_after = excess / self._drain_rate if self._drain_rate else DEFAULT_RETRY_AFTER
+            raise Rejection(
+                503, "QUEUE_FULL",
+                f"Processing backlog is full ({self._queue_depth} documents queued)",
+                retry_after
+            )
+        
+        max_inflight = settings.ADMISSION_MAX_INFLIGHT_BYTES
+        if max_inflight and self.inflight_bytes and self.inflight_bytes + nbytes > max_inflight:
+            raise Rejection(
+                503, "SERVER_BUSY",
+                "Too many uploads in progress; try again shortly",
+                1
+            )
+        
+        min_free = settings.ADMISSION_MIN_FREE_BYTES
+        if min_free and self._free_bytes is not None and self._free_bytes - nbytes < min_free:
+            raise Rejection(
+                503, "INSUFFICIENT_STORAGE",
+                "Upload storage is nearly full",
+                settings.ADMISSION_MAX_RETRY_AFTER
+            )
+    
+    def acquire(self, nbytes: int) -> None:
+        self.inflight_bytes += nbytes
+        ADMISSION_INFLIGHT_BYTES.inc(nbytes)
+    
+    def release(self, nbytes: int) -> None:
+        self.inflight_bytes -= nbytes
+        ADMISSION_INFLIGHT_BYTES.dec(nbytes)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying admission control to upload requests
+    
+    Runs before the multipart body is read, so a refused upload costs
+    neither bandwidth nor temporary disk space. The declared Content-Length
+    (MAX_FILE_SIZE when absent) counts as in-flight until the response ends.
+    """
+    
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+    
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or scope["path"] != self.path or not settings.ADMISSION_ENABLED):
+            await self.app(scope, receive, send)
+            return
+        
+        headers = Headers(scope=scope)
+        try:
+            nbytes = int(headers["content-length"])
+        except (KeyError, ValueError):
+            nbytes = settings.MAX_FILE_SIZE
+        
+        try:
+            admission_controller.take_token(_client_key(scope, headers))
+            await admission_controller.refresh()
+            admission_controller.check_capacity(nbytes)
+        except Rejection as rejection:
+            ADMISSION_REJECTED.labels(reason=rejection.error.lower()).inc()
+            response = JSONResponse(
+                {"detail": {
+                    "error": rejection.error,
+                    "message": rejection.message,
+                    "retry_after": rejection.retry_after
+                }},
+                status_code=rejection.status_code,
+                headers={"Retry-After": str(rejection.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        
+        admission_controller.acquire(nbytes)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_controller.release(nbytes)
+
+
+def _client_key(scope, headers: Headers) -> str:
+    """Identify the client by ADMISSION_CLIENT_HEADER, falling back to its address"""
+    if settings.ADMISSION_CLIENT_HEADER:
+        value = headers.get(settings.ADMISSION_CLIENT_HEADER)
+        if value:
+            return value
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+# Global admission controller instance
+admission_controller = AdmissionController()
+admission_controller.publish_limits()
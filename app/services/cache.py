@@ -0,0 +1,179 @@
+"""
+Document Cache Service
+Read-through cache of serialized document payloads keyed by upload_id
+"""
+import hashlib
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Generation counters only need to outlive a read between get() and set()
+GENERATION_TTL = 3600  # seconds
+
+# SET the payload only while the generation is still the one read before the
+# database query
+_SET_IF_GENERATION = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    return redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return nil
+"""
+
+
+class DocumentCache:
+    """
+    Cache of serialized DocumentResponse payloads
+
+    Backends (DOCUMENT_CACHE_BACKEND):
+    - redis: shared between API processes and invalidated by Celery workers
+    - memory: per-process dict, for tests and single-process development
+    - none: caching disabled
+
+    Redis errors are logged and treated as cache misses so an unavailable
+    cache never fails a request.
+
+    Every invalidation bumps a per-document generation. get() returns the
+    generation seen on a miss and set() only stores the payload if it is
+    unchanged, so a read that raced an invalidation cannot re-cache the
+    stale row it fetched.
+    """
+
+    def __init__(self):
+        self.backend = settings.DOCUMENT_CACHE_BACKEND
+        self.ttl = settings.DOCUMENT_CACHE_TTL
+        self._memory: Dict[str, Tuple[float, str]] = {}
+        self._generations: Dict[str, str] = {}
+        self._async_client = None
+        self._sync_client = None
+
+    @staticmethod
+    def _key(upload_id) -> str:
+        return f"doc:{upload_id}"
+
+    @staticmethod
+    def _generation_key(upload_id) -> str:
+        return f"docgen:{upload_id}"
+
+    @staticmethod
+    def etag(payload: str) -> str:
+        """Strong ETag for a serialized payload"""
+        return '"' + hashlib.blake2b(payload.encode(), digest_size=8).hexdigest() + '"'
+
+    def _redis_async(self):
+        if self._async_client is None:
+            import redis.asyncio
+            self._async_client = redis.asyncio.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+                decode_responses=True
+            )
+        return self._async_client
+
+    def _redis_sync(self):
+        if self._sync_client is None:
+            import redis
+            self._sync_client = redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT,
+                decode_responses=True
+            )
+        return self._sync_client
+
+    async def get(self, upload_id) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return (payload, generation)
+
+        payload is None on a miss; pass generation back to set() once the
+        row has been read. generation is None when caching is unavailable.
+        """
+        key = self._key(upload_id)
+        if self.backend == "memory":
+            entry = self._memory.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1], None
+            self._memory.pop(key, None)
+            return None, self._generations.get(key, "0")
+        if self.backend == "redis":
+            try:
+                payload, generation = await self._redis_async().mget(
+                    key, self._generation_key(upload_id)
+                )
+                return payload, generation or "0"
+            except Exception as e:
+                logger.warning(f"Document cache read failed for {upload_id}: {e}")
+        return None, None
+
+    async def set(self, upload_id, payload: str, generation: Optional[str]) -> None:
+        """
+        Store a payload for up to DOCUMENT_CACHE_TTL seconds
+
+        Skipped when the document was invalidated since get() returned
+        generation.
+        """
+        if generation is None:
+            return
+        key = self._key(upload_id)
+        if self.backend == "memory":
+            if self._generations.get(key, "0") == generation:
+                self._memory[key] = (time.monotonic() + self.ttl, payload)
+        elif self.backend == "redis":
+            try:
+                await self._redis_async().eval(
+                    _SET_IF_GENERATION, 2, key, self._generation_key(upload_id),
+                    generation, payload, self.ttl
+                )
+            except Exception as e:
+                logger.warning(f"Document cache write failed for {upload_id}: {e}")
+
+    def _bump_memory(self, keys) -> None:
+        for key in keys:
+            self._generations[key] = str(int(self._generations.get(key, "0")) + 1)
+            self._memory.pop(key, None)
+
+    def _invalidate_pipeline(self, pipe, upload_ids) -> None:
+        """Bump each generation before dropping the payload"""
+        for upload_id in upload_ids:
+            generation_key = self._generation_key(upload_id)
+            pipe.incr(generation_key)
+            pipe.expire(generation_key, GENERATION_TTL)
+        pipe.delete(*(self._key(upload_id) for upload_id in upload_ids))
+
+    async def invalidate(self, *upload_ids) -> None:
+        """Drop cached payloads after the rows changed (API side)"""
+        keys = [self._key(upload_id) for upload_id in upload_ids]
+        if not keys:
+            return
+        if self.backend == "memory":
+            self._bump_memory(keys)
+        elif self.backend == "redis":
+            try:
+                pipe = self._redis_async().pipeline(transaction=False)
+                self._invalidate_pipeline(pipe, upload_ids)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Document cache invalidation failed: {e}")
+
+    def invalidate_sync(self, *upload_ids) -> None:
+        """Drop cached payloads after the rows changed (Celery worker side)"""
+        keys = [self._key(upload_id) for upload_id in upload_ids]
+        if not keys:
+            return
+        if self.backend == "memory":
+            self._bump_memory(keys)
+        elif self.backend == "redis":
+            try:
+                pipe = self._redis_sync().pipeline(transaction=False)
+                self._invalidate_pipeline(pipe, upload_ids)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Document cache invalidation failed: {e}")
+
+
+# Global document cache instance
+document_cache = DocumentCache()
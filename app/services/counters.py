@@ -0,0 +1,111 @@
+"""
+Document Status Counter Service
+Keeps per-status document totals in step with status transitions
+"""
+from typing import Dict
+from datetime import datetime
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.models.document import Document, DocumentStatus, DocumentStatusCount
+
+
+class StatusCounterService:
+    """Service for reading and maintaining per-status document counts"""
+
+    def adjust(self, db: Session, deltas: Dict[DocumentStatus, int]) -> None:
+        """
+        Apply count deltas inside the caller's transaction
+
+        Args:
+            db: Session that also carries the matching document change
+            deltas: Change in count per status (zero entries are skipped)
+        """
+        for doc_status, delta in deltas.items():
+            if delta:
+                self._upsert(db, doc_status, delta)
+
+    def transition(self, db: Session, document: Document, new_status: DocumentStatus) -> None:
+        """Move a document to a new status and update the counters to match"""
+        old_status = document.status
+        if old_status == new_status:
+            return
+        if old_status is not None:
+            self.adjust(db, {old_status: -1, new_status: 1})
+        else:
+            self.adjust(db, {new_status: 1})
+        document.status = new_status
+
+    def get_counts(self, db: Session) -> Dict[DocumentStatus, int]:
+        """Read all counters; statuses without a row count as zero"""
+        counts = {doc_status: 0 for doc_status in DocumentStatus}
+        for row in db.query(DocumentStatusCount.status, DocumentStatusCount.count):
+            counts[row.status] = row.count
+        return counts
+
+    def reconcile(self, db: Session) -> Dict[DocumentStatus, int]:
+        """
+        Recount documents and overwrite drifted counters
+
+        Counter rows are locked first so concurrent transitions wait for the
+        recount instead of being overwritten by it.
+
+        Returns:
+            dict: Correction applied per status (only non-zero entries)
+        """
+        for doc_status in DocumentStatus:
+            self._upsert(db, doc_status, 0)
+        stored = {
+            row.status: row.count
+            for row in db.query(DocumentStatusCount).with_for_update()
+        }
+        actual = {doc_status: 0 for doc_status in DocumentStatus}
+        actual.update(
+            db.query(Document.status, func.count()).group_by(Document.status).all()
+        )
+
+        drift = {}
+        for doc_status, count in actual.items():
+            if stored.get(doc_status) != count:
+                drift[doc_status] = count - stored.get(doc_status, 0)
+                db.execute(
+                    update(DocumentStatusCount)
+                    .where(DocumentStatusCount.status == doc_status)
+                    .values(count=count, updated_at=datetime.utcnow())
+                )
+        db.commit()
+        return drift
+
+    @staticmethod
+    def _upsert(db: Session, doc_status: DocumentStatus, delta: int) -> None:
+        """Add delta to a counter row, creating it if missing"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            result = db.execute(
+                update(DocumentStatusCount)
+                .where(DocumentStatusCount.status == doc_status)
+                .values(count=DocumentStatusCount.count + delta, updated_at=datetime.utcnow())
+            )
+            if result.rowcount == 0:
+                db.add(DocumentStatusCount(status=doc_status, count=delta))
+                db.flush()
+            return
+
+        stmt = insert(DocumentStatusCount).values(
+            status=doc_status, count=delta, updated_at=datetime.utcnow()
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[DocumentStatusCount.status],
+            set_={
+                "count": DocumentStatusCount.count + delta,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ))
+
+
+# Global status counter service instance
+status_counters = StatusCounterService()
@@ -0,0 +1,275 @@
+"""
+Near-Duplicate Chunk Detection
+MinHash signatures with a persistent LSH index over the whole corpus
+
+Each chunk's word shingles are reduced to a DEDUP_NUM_PERM-value MinHash
+signature, split into DEDUP_BANDS bands. Chunks sharing any band hash are
+candidates; a candidate whose estimated Jaccard similarity reaches
+DEDUP_THRESHOLD marks the chunk as a duplicate of it, so downstream stages
+can reuse the original's embedding instead of computing a new one.
+
+Only non-duplicate chunks are added to the index. Every duplicate points
+straight at an original, and a passage repeated across thousands of
+documents still occupies a single set of band rows.
+
+Documents processed at the same moment do not see each other's chunks;
+such pairs are simply both kept as originals.
+
+Deleting a document releases its originals: the earliest surviving
+duplicate of each takes its place in the index and the remaining
+duplicates are matched against it again.
+"""
+import hashlib
+import struct
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.document import Document, DocumentChunk, DocumentStatus, ChunkLshBand
+
+ChunkKey = Tuple[str, int]  # (upload_id, chunk_index)
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class DedupService:
+    """Compute MinHash signatures and match chunks against the LSH index"""
+    
+    @staticmethod
+    def _format(length: int) -> struct.Struct:
+        return struct.Struct(f"<{length}I")
+    
+    def shingles(self, text: str) -> Set[bytes]:
+        """The distinct overlapping DEDUP_SHINGLE_SIZE-word runs in text"""
+        words = text.lower().split()
+        size = settings.DEDUP_SHINGLE_SIZE
+        if len(words) <= size:
+            return {" ".join(words).encode()}
+        return {
+            " ".join(words[i:i + size]).encode()
+            for i in range(len(words) - size + 1)
+        }
+    
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        MinHash signature of text
+        
+        SHAKE-128 output is split into DEDUP_NUM_PERM independent 32-bit
+        hashes per shingle, which is several times faster in Python than
+        evaluating as many (a*x + b) mod p permutations.
+        """
+        num_perm = settings.DEDUP_NUM_PERM
+        unpack = self._format(num_perm).unpack
+        rows = [
+            unpack(hashlib.shake_128(shingle).digest(4 * num_perm))
+            for shingle in self.shingles(text)
+        ]
+        return tuple(map(min, zip(*rows)))
+    
+    def band_hashes(self, signature: Tuple[int, ...]) -> List[int]:
+        """One signed 64-bit hash per band, as stored in chunk_lsh_bands"""
+        bands = settings.DEDUP_BANDS
+        rows = len(signature) // bands
+        return [
+            _hash64(self.pack(signature[i * rows:(i + 1) * rows])) - (1 << 63)
+            for i in range(bands)
+        ]
+    
+    @staticmethod
+    def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+    
+    def pack(self, signature: Tuple[int, ...]) -> bytes:
+        return self._format(len(signature)).pack(*signature)
+    
+    def unpack(self, data: bytes) -> Tuple[int, ...]:
+        return self._format(len(data) // 4).unpack(data)
+    
+    def annotate(self, db: Session, upload_id: str, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Flag near-duplicate chunks in place and return the LSH band rows to insert
+        
+        Each chunk dict gains minhash and duplicate_of_* keys. Candidates come
+        from completed documents in the index and from earlier chunks of the
+        same document; the most similar one at or above DEDUP_THRESHOLD wins.
+        """
+        if settings.DEDUP_NUM_PERM % settings.DEDUP_BANDS:
+            raise ValueError("DEDUP_BANDS must divide DEDUP_NUM_PERM")
+        
+        signatures = [self.signature(chunk["content"]) for chunk in chunks]
+        bands = [self.band_hashes(signature) for signature in signatures]
+        corpus = self._corpus_candidates(db, upload_id, bands)
+        
+        local: Dict[Tuple[int, int], List[int]] = {}  # band -> earlier original chunk indexes
+        band_rows = []
+        for chunk, signature, chunk_bands in zip(chunks, signatures, bands):
+            keys = list(enumerate(chunk_bands))
+            candidates = {
+                candidate: corpus["signatures"][candidate]
+                for key in keys for candidate in corpus["bands"].get(key, ())
+            }
+            for key in keys:
+                for index in local.get(key, ()):
+                    candidates.setdefault((upload_id, index), signatures[index])
+            
+            best, best_similarity = None, 0.0
+            for candidate, candidate_signature in candidates.items():
+                similarity = self.similarity(signature, candidate_signature)
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+            
+            chunk["minhash"] = self.pack(signature)
+            if best is not None and best_similarity >= settings.DEDUP_THRESHOLD:
+                chunk["duplicate_of_upload_id"], chunk["duplicate_of_chunk_index"] = best
+                chunk["duplicate_similarity"] = round(best_similarity, 4)
+                continue
+            
+            chunk["duplicate_of_upload_id"] = None
+            chunk["duplicate_of_chunk_index"] = None
+            chunk["duplicate_similarity"] = None
+            for key in keys:
+                local.setdefault(key, []).append(chunk["chunk_index"])
+                band_rows.append({
+                    "band_index": key[0],
+                    "band_hash": key[1],
+                    "upload_id": upload_id,
+                    "chunk_index": chunk["chunk_index"],
+                })
+        return band_rows
+    
+    def _corpus_candidates(self, db: Session, upload_id: str, bands: List[List[int]]) -> Dict[str, Any]:
+        """Indexed chunks of other completed documents sharing a band with any chunk"""
+        keys = sorted({key for chunk_bands in bands for key in enumerate(chunk_bands)})
+        batch_size = settings.BULK_QUERY_BATCH_SIZE
+        
+        by_band: Dict[Tuple[int, int], List[ChunkKey]] = {}
+        for start in range(0, len(keys), batch_size):
+            rows = db.execute(
+                select(
+                    ChunkLshBand.band_index, ChunkLshBand.band_hash,
+                    ChunkLshBand.upload_id, ChunkLshBand.chunk_index
+                ).where(
+                    tuple_(ChunkLshBand.band_index, ChunkLshBand.band_hash).in_(keys[start:start + batch_size]),
+                    ChunkLshBand.upload_id != upload_id
+                )
+            )
+            for band_index, band_hash, other_id, chunk_index in rows:
+                by_band.setdefault((band_index, band_hash), []).append((other_id, chunk_index))
+        
+        matched = sorted({candidate for candidates in by_band.values() for candidate in candidates})
+        signatures: Dict[ChunkKey, Tuple[int, ...]] = {}
+        for start in range(0, len(matched), batch_size):
+            rows = db.execute(
+                select(DocumentChunk.upload_id, DocumentChunk.chunk_index, DocumentChunk.minhash)
+                .join(Document, Document.upload_id == DocumentChunk.upload_id)
+                .where(
+                    tuple_(DocumentChunk.upload_id, DocumentChunk.chunk_index).in_(matched[start:start + batch_size]),
+                    Document.status == DocumentStatus.COMPLETED
+                )
+            )
+            for other_id, chunk_index, minhash in rows:
+                signatures[(other_id, chunk_index)] = self.unpack(minhash)
+        
+        # Drop candidates whose document is not (or no longer) completed
+        by_band = {
+            key: [candidate for candidate in candidates if candidate in signatures]
+            for key, candidates in by_band.items()
+        }
+        return {"bands": by_band, "signatures": signatures}
+    
+    def release(self, db: Session, upload_ids: Iterable[str]) -> int:
+        """
+        Promote surviving duplicates of chunks about to be deleted (caller commits)
+        
+        For each deleted original, its duplicates in other documents are
+        visited oldest first. A duplicate at or above DEDUP_THRESHOLD of an
+        already promoted one is re-pointed at it; otherwise it becomes an
+        original and its bands are added to the index.
+        
+        Returns:
+            int: Number of chunks promoted to original
+        """
+        upload_ids = list(upload_ids)
+        if not upload_ids:
+            return 0
+        rows = db.execute(
+            select(
+                DocumentChunk.upload_id, DocumentChunk.chunk_index, DocumentChunk.minhash,
+                DocumentChunk.duplicate_of_upload_id, DocumentChunk.duplicate_of_chunk_index
+            )
+            .join(Document, Document.upload_id == DocumentChunk.upload_id)
+            .where(
+                DocumentChunk.duplicate_of_upload_id.in_(upload_ids),
+                DocumentChunk.upload_id.notin_(upload_ids)
+            )
+            .order_by(Document.processed_at, DocumentChunk.upload_id, DocumentChunk.chunk_index)
+        ).all()
+        
+        groups: Dict[ChunkKey, List[Any]] = {}
+        for row in rows:
+            groups.setdefault((row.duplicate_of_upload_id, row.duplicate_of_chunk_index), []).append(row)
+        
+        updates, band_rows = [], []
+        for group in groups.values():
+            promoted: List[Tuple[ChunkKey, Tuple[int, ...]]] = []
+            for row in group:
+                signature = self.unpack(row.minhash)
+                best, best_similarity = None, 0.0
+                for candidate, candidate_signature in promoted:
+                    similarity = self.similarity(signature, candidate_signature)
+                    if similarity > best_similarity:
+                        best, best_similarity = candidate, similarity
+                
+                if best is not None and best_similarity >= settings.DEDUP_THRESHOLD:
+                    updates.append({
+                        "upload_id": row.upload_id,
+                        "chunk_index": row.chunk_index,
+                        "duplicate_of_upload_id": best[0],
+                        "duplicate_of_chunk_index": best[1],
+                        "duplicate_similarity": round(best_similarity, 4),
+                    })
+                    continue
+                
+                promoted.append(((row.upload_id, row.chunk_index), signature))
+                updates.append({
+                    "upload_id": row.upload_id,
+                    "chunk_index": row.chunk_index,
+                    "duplicate_of_upload_id": None,
+                    "duplicate_of_chunk_index": None,
+                    "duplicate_similarity": None,
+                })
+                band_rows.extend(
+                    {
+                        "band_index": band_index,
+                        "band_hash": band_hash,
+                        "upload_id": row.upload_id,
+                        "chunk_index": row.chunk_index,
+                    }
+                    for band_index, band_hash in enumerate(self.band_hashes(signature))
+                )
+        
+        if updates:
+            db.execute(update(DocumentChunk), updates)
+        if band_rows:
+            db.execute(insert(ChunkLshBand), band_rows)
+        return len(band_rows) // settings.DEDUP_BANDS
+    
+    @staticmethod
+    def summary(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Per-document dedup report stored in doc_metadata["dedup"]"""
+        duplicates = sum(chunk.get("duplicate_of_upload_id") is not None for chunk in chunks)
+        return {
+            "chunks": len(chunks),
+            "duplicates": duplicates,
+            "ratio": round(duplicates / len(chunks), 4) if chunks else 0.0,
+            "threshold": settings.DEDUP_THRESHOLD,
+        }
+
+
+# Global dedup instance
+dedup_service = DedupService()
@@ -0,0 +1,235 @@
+"""
+Chunk Export
+Streams stored chunks out as NDJSON, Arrow IPC or Parquet
+
+Rows are read with a server-side cursor (yield_per) in EXPORT_BATCH_SIZE
+partitions and each partition is encoded and handed to the caller before
+the next is fetched, so memory stays flat however large the export is.
+
+Incremental exports
+Rows are ordered by (processed_at, upload_id, chunk_index). Passing the
+last row's processed_at and upload_id as processed_after/after_upload_id
+resumes strictly after that document, so documents sharing a timestamp
+are neither repeated nor dropped.
+
+processed_at is set by the worker in the UPDATE that marks the document
+completed, a moment before that transaction commits. Several workers can
+commit out of order, so documents processed within the last
+EXPORT_SETTLE_SECONDS are held back. The guarantee: a document is
+exported exactly once by a chain of incremental exports, provided its
+transaction commits within EXPORT_SETTLE_SECONDS of its processed_at
+(worker clock skew included). Reprocessing a document gives it a new
+processed_at, and it is exported again.
+
+Arrow and Parquet need the optional pyarrow package.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.document import Document, DocumentChunk, DocumentStatus
+from app.schemas.export import ExportFormat
+
+# Response media type of each export format
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+class ExportFormatUnavailable(Exception):
+    """The requested format needs a package that is not installed"""
+
+
+class _ByteSink:
+    """Write-only file object collecting pyarrow's output between batches"""
+    
+    closed = False
+    
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+class ChunkEncoder(ABC):
+    """Encode partitions of chunk rows; tracks the resume point of the export"""
+    
+    def __init__(self):
+        self.rows = 0
+        self.last_processed_at: Optional[datetime] = None
+        self.last_upload_id: Optional[str] = None
+    
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        if rows:
+            self.rows += len(rows)
+            self.last_processed_at = rows[-1]["processed_at"]
+            self.last_upload_id = rows[-1]["upload_id"]
+        return self._encode(rows)
+    
+    @abstractmethod
+    def _encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        """Encode one partition of rows"""
+    
+    def finish(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder(ChunkEncoder):
+    """One JSON object per line"""
+    
+    def _encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        return b"".join(
+            orjson.dumps(dict(row), option=orjson.OPT_APPEND_NEWLINE) for row in rows
+        )
+
+
+class ArrowEncoder(ChunkEncoder):
+    """Arrow IPC stream, or Parquet with one row group per partition"""
+    
+    def __init__(self, parquet: bool):
+        super().__init__()
+        try:
+            import pyarrow as pa
+            if parquet:
+                import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportFormatUnavailable(
+                f"{'parquet' if parquet else 'arrow'} export requires pyarrow; install it or use ndjson"
+            )
+        self._pa = pa
+        self._schema = pa.schema([
+            ("upload_id", pa.string()),
+            ("filename", pa.string()),
+            ("chunk_index", pa.int32()),
+            ("content", pa.large_string()),
+            ("word_count", pa.int32()),
+            ("start_word", pa.int32()),
+            ("end_word", pa.int32()),
+            ("duplicate_of_upload_id", pa.string()),
+            ("duplicate_of_chunk_index", pa.int32()),
+            ("duplicate_similarity", pa.float32()),
+            ("processed_at", pa.timestamp("us")),
+        ])
+        self._sink = _ByteSink()
+        if parquet:
+            self._writer = pq.ParquetWriter(self._sink, self._schema)
+        else:
+            self._writer = pa.ipc.new_stream(self._sink, self._schema)
+    
+    def _encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        if rows:
+            columns = {
+                name: [row[name] for row in rows] for name in self._schema.names
+            }
+            self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+        return self._sink.drain()
+    
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class ExportService:
+    """Build chunk export queries and stream them through an encoder"""
+    
+    def encoder(self, fmt: ExportFormat) -> ChunkEncoder:
+        """Fresh encoder for one export; raises ExportFormatUnavailable"""
+        if fmt == ExportFormat.NDJSON:
+            return NdjsonEncoder()
+        return ArrowEncoder(parquet=fmt == ExportFormat.PARQUET)
+    
+    def query(
+        self,
+        doc_status: DocumentStatus = DocumentStatus.COMPLETED,
+        processed_after: Optional[datetime] = None,
+        after_upload_id: Optional[str] = None,
+        processed_before: Optional[datetime] = None
+    ):
+        """
+        Chunks of documents in doc_status, processed after the given point
+        
+        Without after_upload_id, processed_after is inclusive. processed_before
+        (inclusive) is capped at EXPORT_SETTLE_SECONDS ago.
+        """
+        stmt = (
+            select(
+                DocumentChunk.upload_id,
+                Document.filename,
+                DocumentChunk.chunk_index,
+                DocumentChunk.content,
+                DocumentChunk.word_count,
+                DocumentChunk.start_word,
+                DocumentChunk.end_word,
+                DocumentChunk.duplicate_of_upload_id,
+                DocumentChunk.duplicate_of_chunk_index,
+                DocumentChunk.duplicate_similarity,
+                Document.processed_at,
+            )
+            .join(Document, Document.upload_id == DocumentChunk.upload_id)
+            .where(Document.status == doc_status)
+            .order_by(Document.processed_at, DocumentChunk.upload_id, DocumentChunk.chunk_index)
+            .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        if processed_after is not None and after_upload_id is not None:
+            stmt = stmt.where(
+                tuple_(Document.processed_at, Document.upload_id)
+                > tuple_(_naive_utc(processed_after), after_upload_id)
+            )
+        elif processed_after is not None:
+            stmt = stmt.where(Document.processed_at >= _naive_utc(processed_after))
+        settled = datetime.utcnow() - timedelta(seconds=settings.EXPORT_SETTLE_SECONDS)
+        if processed_before is not None:
+            settled = min(settled, _naive_utc(processed_before))
+        return stmt.where(Document.processed_at <= settled)
+    
+    def iter_export(self, db: Session, encoder: ChunkEncoder, **filters) -> Iterator[bytes]:
+        """Encoded export, one piece per partition (scripts and workers)"""
+        result = db.execute(self.query(**filters))
+        for partition in result.mappings().partitions():
+            yield encoder.encode(partition)
+        yield encoder.finish()
+    
+    async def stream_export(self, db: AsyncSession, encoder: ChunkEncoder, **filters) -> AsyncIterator[bytes]:
+        """Encoded export, one piece per partition (API)"""
+        result = await db.stream(self.query(**filters))
+        async for partition in result.mappings().partitions():
+            yield encoder.encode(partition)
+        yield encoder.finish()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """processed_at is stored as naive UTC; align aware bounds with it"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Global export instance
+export_service = ExportService()
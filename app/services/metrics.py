@@ -0,0 +1,126 @@
+"""
+Prometheus Metrics
+Pipeline histograms shared by the API and Celery workers
+
+Histograms are plain in-process counters, cheap enough to leave on in
+production. With several processes per host (uvicorn workers, Celery
+prefork children) set PROMETHEUS_MULTIPROC_DIR to an empty directory before
+start-up; both exporters then aggregate across processes.
+"""
+import logging
+import os
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets from 5ms to 10 minutes
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600
+)
+# Size buckets from 1KB to the 50MB upload limit
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+# Ratio buckets in tenths
+RATIO_BUCKETS = tuple(i / 10 for i in range(11))
+
+UPLOAD_BYTES = Histogram(
+    "rag_upload_bytes", "Size of accepted uploads", buckets=SIZE_BUCKETS
+)
+UPLOAD_LATENCY = Histogram(
+    "rag_upload_seconds", "Upload request handling time", buckets=DURATION_BUCKETS
+)
+SAVE_FILE_DURATION = Histogram(
+    "rag_save_file_seconds", "Time to write an upload to storage", buckets=DURATION_BUCKETS
+)
+EXTRACTION_DURATION = Histogram(
+    "rag_extraction_seconds", "Text extraction time per document",
+    ["file_type"], buckets=DURATION_BUCKETS
+)
+EXTRACTION_PAGE_DURATION = Histogram(
+    "rag_extraction_page_seconds", "Text extraction time per PDF page",
+    ["file_type"], buckets=DURATION_BUCKETS
+)
+CHUNKING_DURATION = Histogram(
+    "rag_chunking_seconds", "Time to chunk extracted text", buckets=DURATION_BUCKETS
+)
+DB_COMMIT_DURATION = Histogram(
+    "rag_db_commit_seconds", "Database commit time",
+    ["operation"], buckets=DURATION_BUCKETS
+)
+QUEUE_WAIT = Histogram(
+    "rag_queue_wait_seconds", "Time from enqueue to processing start",
+    buckets=DURATION_BUCKETS
+)
+DUPLICATE_CHUNKS = Counter(
+    "rag_duplicate_chunks", "Chunks flagged as near-duplicates of an earlier chunk"
+)
+DEDUP_RATIO = Histogram(
+    "rag_document_dedup_ratio", "Fraction of a document's chunks that are near-duplicates",
+    buckets=RATIO_BUCKETS
+)
+DOCUMENTS_BY_STATUS = Gauge(
+    "rag_documents", "Documents per processing status",
+    ["status"], multiprocess_mode="mostrecent"
+)
+ADMISSION_REJECTED = Counter(
+    "rag_admission_rejected", "Uploads refused by admission control", ["reason"]
+)
+ADMISSION_INFLIGHT_BYTES = Gauge(
+    "rag_admission_inflight_bytes", "Declared bytes of uploads being received",
+    multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "rag_admission_queue_depth", "Pending plus processing documents seen by admission control",
+    multiprocess_mode="mostrecent"
+)
+ADMISSION_LIMIT = Gauge(
+    "rag_admission_limit", "Configured admission control limits (0 = disabled)",
+    ["limit"], multiprocess_mode="mostrecent"
+)
+
+
+def _registry():
+    """Registry to export: aggregated across processes in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest() -> bytes:
+    """
+    Refresh scrape-time gauges and render the exposition format
+    
+    A database outage must not take the other metrics down with it: the
+    status gauges then keep their last values and the error is logged.
+    """
+    from app.database import SessionLocal
+    from app.services.counters import status_counters
+    
+    db = SessionLocal()
+    try:
+        for doc_status, count in status_counters.get_counts(db).items():
+            DOCUMENTS_BY_STATUS.labels(status=doc_status.value).set(count)
+    except Exception as e:
+        logger.error(f"Could not refresh document status gauges: {str(e)}")
+    finally:
+        db.close()
+    return generate_latest(_registry())
+
+
+def start_worker_exporter() -> None:
+    """Serve worker metrics on WORKER_METRICS_PORT (0 disables)"""
+    if settings.WORKER_METRICS_PORT:
+        from prometheus_client import start_http_server
+        start_http_server(settings.WORKER_METRICS_PORT, registry=_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a finished child's live gauges in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,180 @@
+"""
+Sampling Profiler
+Opt-in cProfile capture for API requests and Celery tasks
+
+A configurable fraction of requests/tasks (plus any request carrying the
+profile header) is run under cProfile and the stats are written to a
+bounded on-disk ring. Profiles can be listed and downloaded through the
+admin endpoints and inspected with `python -m pstats <file>` or snakeviz.
+
+cProfile records everything that runs on the profiled thread, not just the
+sampled unit of work. An API request shares the event loop thread with
+every other coroutine, so its profile also contains whatever those
+coroutines executed while it was awaiting; treat request profiles as a
+view of the loop during that window. Celery tasks run one per thread and
+are profiled cleanly.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+
+from starlette.datastructures import Headers
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Profile file names are generated here; anything else is rejected on download
+PROFILE_NAME_PATTERN = re.compile(r"^[0-9]+-[a-z]+-[A-Za-z0-9_.-]+\.prof$")
+
+
+class ProfilerService:
+    """Decide which units of work to profile and keep the on-disk ring"""
+    
+    def __init__(self):
+        # cProfile hooks the whole thread; only one capture can run at a time
+        self._lock = threading.Lock()
+    
+    @property
+    def profile_dir(self) -> Path:
+        return Path(settings.PROFILE_DIR)
+    
+    def is_forced(self, header_value: Optional[str]) -> bool:
+        """
+        Whether a request's profile header asks for a capture
+        
+        With ADMIN_TOKEN set the header must carry the token, so outside
+        callers cannot make every request pay for profiling.
+        """
+        if header_value is None:
+            return False
+        if not settings.ADMIN_TOKEN:
+            return True
+        return hmac.compare_digest(header_value.encode(), settings.ADMIN_TOKEN.encode())
+    
+    def should_profile(self, forced: bool = False) -> bool:
+        """Sample at PROFILE_SAMPLE_RATE, or always when explicitly requested"""
+        if not settings.PROFILING_ENABLED:
+            return False
+        return forced or random.random() < settings.PROFILE_SAMPLE_RATE
+    
+    def start(self, forced: bool = False) -> Optional[Tuple[cProfile.Profile, float]]:
+        """
+        Begin a capture if this unit of work is sampled
+        
+        Returns None when not sampled or when another capture is already
+        running in this process, so concurrent work never blocks on the
+        profiler. Every non-None capture must be passed to finish().
+        """
+        if not self.should_profile(forced) or not self._lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler, time.perf_counter()
+    
+    def finish(self, capture: Optional[Tuple[cProfile.Profile, float]], kind: str, label: str) -> None:
+        """Stop a capture from start() and write it to the ring"""
+        if capture is None:
+            return
+        profiler, started = capture
+        try:
+            profiler.disable()
+            self._save(kind, label, profiler, time.perf_counter() - started)
+        finally:
+            self._lock.release()
+    
+    @contextmanager
+    def profile(self, kind: str, label: str, forced: bool = False) -> Iterator[None]:
+        """Run the enclosed block under cProfile if it is sampled"""
+        capture = self.start(forced)
+        try:
+            yield
+        finally:
+            self.finish(capture, kind, label)
+    
+    def _save(self, kind: str, label: str, profiler: cProfile.Profile, duration: float) -> None:
+        """Write stats into the ring and evict the oldest profiles"""
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")[:80] or "root"
+            name = f"{time.time_ns()}-{kind}-{slug}-{int(duration * 1000)}ms.prof"
+            profiler.dump_stats(self.profile_dir / name)
+            self._prune()
+        except OSError as e:
+            logger.warning(f"Could not write profile: {e}")
+    
+    def _prune(self) -> None:
+        """Keep only the newest PROFILE_MAX_FILES profiles"""
+        names = sorted(self._profile_names())
+        for name in names[:-settings.PROFILE_MAX_FILES or None]:
+            try:
+                os.remove(self.profile_dir / name)
+            except FileNotFoundError:
+                pass
+    
+    def _profile_names(self) -> List[str]:
+        try:
+            return [
+                name for name in os.listdir(self.profile_dir)
+                if PROFILE_NAME_PATTERN.match(name)
+            ]
+        except FileNotFoundError:
+            return []
+    
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Profiles in the ring, newest first"""
+        profiles = []
+        for name in sorted(self._profile_names(), reverse=True):
+            try:
+                stat = os.stat(self.profile_dir / name)
+            except FileNotFoundError:
+                continue
+            timestamp, kind, _ = name.split("-", 2)
+            profiles.append({
+                "name": name,
+                "kind": kind,
+                "created_at": int(timestamp) / 1e9,
+                "size": stat.st_size,
+            })
+        return profiles
+    
+    def get_path(self, name: str) -> Optional[Path]:
+        """Resolve a profile name to its file, or None if it is not in the ring"""
+        if not PROFILE_NAME_PATTERN.match(name):
+            return None
+        path = self.profile_dir / name
+        return path if path.is_file() else None
+
+
+# Global profiler instance
+profiler_service = ProfilerService()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling sampled requests
+    
+    Plain ASGI rather than BaseHTTPMiddleware so it costs a single settings
+    check while profiling is disabled, and covers streamed response bodies.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        forced = profiler_service.is_forced(Headers(scope=scope).get(settings.PROFILE_HEADER))
+        label = f"{scope['method']} {scope['path']}"
+        with profiler_service.profile("request", label, forced):
+            await self.app(scope, receive, send)
@@ -0,0 +1,139 @@
+"""
+Readiness Service
+Concurrent dependency probes behind the /ready endpoint
+
+Each probe runs with its own timeout and all probes run at once, so a check
+costs as long as the slowest dependency rather than the sum. Results are
+cached for READY_CACHE_TTL seconds so load-balancer polling does not reach
+the dependencies at all.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.services.storage import storage_service
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessService:
+    """Probe the database, broker, storage and workers; cache the verdict"""
+    
+    def __init__(self):
+        self._result: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._redis = None
+        self._worker_ping_running = False
+    
+    async def check(self, force: bool = False) -> Dict[str, Any]:
+        """Return the cached readiness report, refreshing it when stale"""
+        if not force and self._result and time.monotonic() < self._expires_at:
+            return {**self._result, "cached": True}
+        
+        # Concurrent callers during a refresh wait for the same probes
+        async with self._lock:
+            if not force and self._result and time.monotonic() < self._expires_at:
+                return {**self._result, "cached": True}
+            self._result = await self._run_probes()
+            self._expires_at = time.monotonic() + settings.READY_CACHE_TTL
+        return {**self._result, "cached": False}
+    
+    async def _run_probes(self) -> Dict[str, Any]:
+        probes: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]] = {
+            "database": self._probe_database,
+            "broker": self._probe_broker,
+            "storage": self._probe_storage,
+            "workers": self._probe_workers,
+        }
+        results = await asyncio.gather(*(
+            self._timed(name, probe) for name, probe in probes.items()
+        ))
+        report = dict(zip(probes, results))
+        ready = all(
+            result["ok"] for name, result in report.items()
+            if name in settings.READY_REQUIRED_PROBES
+        )
+        return {
+            "status": "ready" if ready else "not_ready",
+            "checked_at": time.time(),
+            "probes": report,
+        }
+    
+    async def _timed(self, name: str, probe: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run one probe under READY_PROBE_TIMEOUT and record its latency"""
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"required": name in settings.READY_REQUIRED_PROBES}
+        try:
+            detail = await asyncio.wait_for(probe(), timeout=settings.READY_PROBE_TIMEOUT)
+            result.update(ok=True, detail=detail)
+        except asyncio.TimeoutError:
+            result.update(ok=False, error=f"timed out after {settings.READY_PROBE_TIMEOUT}s")
+        except Exception as e:
+            result.update(ok=False, error=str(e) or type(e).__name__)
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        if not result["ok"]:
+            logger.warning(f"Readiness probe {name} failed: {result['error']}")
+        return result
+    
+    async def _probe_database(self) -> Dict[str, Any]:
+        """Check out a pooled connection and run a trivial query"""
+        from app.database import get_async_engine
+        
+        async_engine = get_async_engine()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        pool = async_engine.pool
+        detail = {"pool": type(pool).__name__}
+        if hasattr(pool, "checkedout"):
+            detail.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        return detail
+    
+    async def _probe_broker(self) -> Dict[str, Any]:
+        """PING the Redis broker"""
+        if self._redis is None:
+            import redis.asyncio
+            self._redis = redis.asyncio.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.READY_PROBE_TIMEOUT,
+                socket_connect_timeout=settings.READY_PROBE_TIMEOUT
+            )
+        await self._redis.ping()
+        return {}
+    
+    async def _probe_storage(self) -> Dict[str, Any]:
+        """Upload directory must have READY_MIN_FREE_BYTES free"""
+        usage = await asyncio.to_thread(storage_service.disk_usage)
+        if usage.free < settings.READY_MIN_FREE_BYTES:
+            raise RuntimeError(
+                f"{usage.free} bytes free, below the {settings.READY_MIN_FREE_BYTES} byte minimum"
+            )
+        return {"free_bytes": usage.free, "total_bytes": usage.total}
+    
+    async def _probe_workers(self) -> Dict[str, Any]:
+        """At least one Celery worker answers a broadcast ping"""
+        # A timed-out ping keeps its thread; never stack a second one behind it
+        if self._worker_ping_running:
+            raise RuntimeError("previous worker ping still running")
+        self._worker_ping_running = True
+        replies = await asyncio.to_thread(self._ping_workers)
+        if not replies:
+            raise RuntimeError("no Celery workers replied")
+        return {"workers": [name for reply in replies for name in reply]}
+    
+    def _ping_workers(self):
+        from app.tasks.celery_app import celery_app
+        
+        try:
+            # Stop waiting at the first reply; leave headroom inside the probe timeout
+            return celery_app.control.ping(timeout=settings.READY_PROBE_TIMEOUT / 2, limit=1)
+        finally:
+            self._worker_ping_running = False
+
+
+# Global readiness instance
+readiness_service = ReadinessService()
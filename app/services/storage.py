@@ -3,10 +3,14 @@ File Storage Service
 Handles file upload, storage, and retrieval
 """
 import os
+import shutil
 import aiofiles
+import anyio
 from pathlib import Path
+from typing import BinaryIO, Iterator, Mapping, Optional, Tuple
 from uuid import UUID
 from fastapi import UploadFile
+from starlette.responses import Response
 
 from app.config import settings
 
@@ -15,8 +19,8 @@ class StorageService:
     """Service for managing file storage"""
     
     def __init__(self):
+        # Created on first save rather than at import time
         self.base_dir = Path(settings.UPLOAD_DIR)
-        self.base_dir.mkdir(parents=True, exist_ok=True)
     
     async def save_file(self, upload_id: UUID, file: UploadFile) -> str:
         """
@@ -48,6 +52,29 @@ class StorageService:
         """Get full path to a stored file"""
         return str(self.base_dir / str(upload_id) / filename)
     
+    async def open_file(self, file_path: str) -> Optional[Tuple[BinaryIO, os.stat_result]]:
+        """
+        Open a stored file for reading along with its stat
+        
+        The stat comes from the open descriptor, so validators built from it
+        describe exactly the bytes that will be served. Both calls run on a
+        worker thread. Returns None if the file is gone; otherwise the caller
+        owns the file and must close it.
+        """
+        return await anyio.to_thread.run_sync(self._open_with_stat, file_path)
+    
+    @staticmethod
+    def _open_with_stat(file_path: str) -> Optional[Tuple[BinaryIO, os.stat_result]]:
+        try:
+            file = open(file_path, "rb")
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+        try:
+            return file, os.fstat(file.fileno())
+        except BaseException:
+            file.close()
+            raise
+    
     def delete_file(self, file_path: str) -> bool:
         """Delete a file from storage"""
         try:
@@ -64,6 +91,41 @@ class StorageService:
         except Exception:
             return False
     
+    def iter_upload_dirs(self) -> Iterator[Tuple[str, str, float]]:
+        """
+        Stream per-upload directories without listing the whole tree
+        
+        Yields:
+            tuple: (directory name, full path, modification time)
+        """
+        try:
+            entries = os.scandir(self.base_dir)
+        except FileNotFoundError:
+            return  # Nothing uploaded yet
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield entry.name, entry.path, entry.stat(follow_symlinks=False).st_mtime
+    
+    def disk_usage(self):
+        """Usage of the filesystem holding the upload directory, which may not exist yet"""
+        path = self.base_dir.resolve()
+        while not path.exists():
+            path = path.parent
+        return shutil.disk_usage(path)
+    
+    def remove_upload_dir(self, path: str) -> int:
+        """Remove an upload directory and return the number of bytes freed"""
+        freed = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    freed += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        shutil.rmtree(path, ignore_errors=True)
+        return freed
+    
     @staticmethod
     def _sanitize_filename(filename: str) -> str:
         """Sanitize filename to prevent path traversal"""
@@ -74,5 +136,61 @@ class StorageService:
         return filename or "unnamed_file"
 
 
+class FileRangeResponse(Response):
+    """
+    Stream a byte range of an open file, then close it
+    
+    Uses the ASGI zero-copy extension (the server sendfile()s straight from
+    the descriptor) when the server offers it. Otherwise the slice is read
+    with pread() in chunk_size pieces on a worker thread, so memory
+    stays bounded and the event loop never blocks on disk.
+    """
+    
+    chunk_size = 256 * 1024
+    
+    def __init__(self, file: BinaryIO, offset: int, length: int, status_code: int = 200,
+                 headers: Optional[Mapping[str, str]] = None, media_type: Optional[str] = None,
+                 send_body: bool = True):
+        self.file = file
+        self.offset = offset
+        self.length = length
+        self.send_body = send_body
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**(headers or {}), "Content-Length": str(length)})
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if not self.send_body or not self.length:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            elif "http.response.zerocopy" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": self.file,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            else:
+                await self._send_chunks(send)
+        finally:
+            self.file.close()
+    
+    async def _send_chunks(self, send) -> None:
+        fd = self.file.fileno()
+        offset, remaining = self.offset, self.length
+        while remaining:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(self.chunk_size, remaining), offset)
+            if not chunk:
+                break  # Truncated since it was opened; Content-Length is already sent
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+        if remaining:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
 # Global storage service instance
 storage_service = StorageService()
@@ -0,0 +1,196 @@
+"""
+Document Tracing
+Spans for one document's path from upload through the worker stages
+
+A trace id is minted at upload and travels to process_document in the
+Celery message headers. Each side records its stages as spans; the span
+durations are stored in the document's doc_metadata["trace"] and, when
+TRACE_EXPORT_PATH is set, every batch of spans is appended to that file as
+one OTLP/JSON ExportTraceServiceRequest per line (the format of the
+OpenTelemetry collector's file exporter, readable by otel-cli, Jaeger
+importers or a collector with the otlpjsonfile receiver).
+"""
+import json
+import logging
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CONSUMER = 5
+
+# OTLP status codes
+STATUS_CODE_ERROR = 2
+
+
+def new_trace_id() -> str:
+    """128-bit trace id, hex encoded as in W3C traceparent"""
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+class Span:
+    """A timed stage of document ingestion"""
+    
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str],
+                 kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+    
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.error:
+            span["status"] = {"code": STATUS_CODE_ERROR, "message": self.error}
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Encode an attribute value as an OTLP AnyValue"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Trace:
+    """
+    Spans recorded by one process for one document
+    
+    Spans opened with span() nest under the innermost open span, or under
+    the remote parent (e.g. the upload span, for the worker) at the top.
+    """
+    
+    def __init__(self, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None):
+        self.trace_id = trace_id or new_trace_id()
+        self.parent_span_id = parent_span_id
+        self.spans: List[Span] = []
+        self._stack: List[Span] = []
+        self._remote_timings: Dict[str, float] = {}
+    
+    @property
+    def current_span_id(self) -> Optional[str]:
+        return self._stack[-1].span_id if self._stack else self.parent_span_id
+    
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Span:
+        """Open a span; later spans nest under it until end_span()"""
+        span = Span(name, self.trace_id, self.current_span_id, kind, attributes)
+        self.spans.append(span)
+        self._stack.append(span)
+        return span
+    
+    def end_span(self, span: Span, error: Optional[Exception] = None) -> None:
+        """Close a span; closing it again keeps the first end time"""
+        if span.end_ns is None:
+            span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = str(error)
+        if span in self._stack:
+            self._stack.remove(span)
+    
+    @contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Iterator[Span]:
+        span = self.start_span(name, kind, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            self.end_span(span, e)
+            raise
+        self.end_span(span)
+    
+    def add_span(self, name: str, start_ns: int, end_ns: int, **attributes) -> Span:
+        """Record a span measured elsewhere, such as time spent queued"""
+        span = Span(name, self.trace_id, self.current_span_id, attributes=attributes)
+        span.start_ns = start_ns
+        span.end_ns = end_ns
+        self.spans.append(span)
+        return span
+    
+    def merge_timings(self, timings: Optional[Dict[str, float]]) -> None:
+        """Include durations measured by another process, such as the upload's commit"""
+        self._remote_timings.update(timings or {})
+    
+    def timings(self) -> Dict[str, float]:
+        """Finished span durations in milliseconds, keyed by span name"""
+        return {
+            **self._remote_timings,
+            **{
+                span.name: round(span.duration_ms, 3)
+                for span in self.spans if span.end_ns is not None
+            },
+        }
+    
+    def annotate(self, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Copy of doc_metadata with this trace's timings merged in
+        
+        Returns a new dict so SQLAlchemy notices the JSON column changed.
+        """
+        metadata = dict(metadata or {})
+        previous = metadata.get("trace") or {}
+        spans = previous.get("spans", {}) if previous.get("trace_id") == self.trace_id else {}
+        metadata["trace"] = {"trace_id": self.trace_id, "spans": {**spans, **self.timings()}}
+        return metadata
+    
+    def export(self) -> None:
+        """Append the recorded spans to TRACE_EXPORT_PATH, if configured"""
+        if not settings.TRACE_EXPORT_PATH or not self.spans:
+            return
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": settings.TRACE_SERVICE_NAME}},
+                    {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in self.spans],
+                }],
+            }]
+        }
+        try:
+            directory = os.path.dirname(settings.TRACE_EXPORT_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # One write per line keeps concurrent appenders from interleaving
+            with open(settings.TRACE_EXPORT_PATH, "a") as f:
+                f.write(json.dumps(request, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not export trace {self.trace_id}: {str(e)}")
@@ -2,14 +2,20 @@
 Celery Application Configuration
 """
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown, task_prerun, task_postrun
+import os
+
 from app.config import settings
+from app.services.metrics import start_worker_exporter, mark_process_dead
+from app.services.profiler import profiler_service
+
 
 # Initialize Celery app
 celery_app = Celery(
     'rag_tasks',
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=['app.tasks.processing']
+    include=['app.tasks.processing', 'app.tasks.maintenance', 'app.tasks.cleanup']
 )
 
 # Celery configuration
@@ -24,4 +30,68 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # Soft timeout at 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    beat_schedule={
+        'reconcile-status-counts': {
+            'task': 'app.tasks.maintenance.reconcile_status_counts',
+            'schedule': settings.STATUS_COUNT_RECONCILE_INTERVAL,
+        },
+        'resume-deletion-jobs': {
+            'task': 'app.tasks.cleanup.resume_deletion_jobs',
+            'schedule': settings.DELETION_STALE_AFTER,
+        },
+        'collect-garbage': {
+            'task': 'app.tasks.cleanup.collect_garbage',
+            'schedule': settings.GC_INTERVAL,
+        },
+    },
 )
+
+
+@worker_init.connect
+def _start_metrics_exporter(**kwargs):
+    """Expose worker metrics once, from the parent worker process"""
+    start_worker_exporter()
+
+
+@worker_init.connect
+def _preload_parsers(**kwargs):
+    """Import document parsers before the pool forks (WORKER_PRELOAD_PARSERS)"""
+    if settings.WORKER_PRELOAD_PARSERS:
+        from app.tasks.processing import preload_parsers
+        preload_parsers()
+
+
+@worker_process_shutdown.connect
+def _cleanup_process_metrics(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
+
+
+def request_header(request, name: str):
+    """
+    Read a custom message header from a task request
+    
+    Workers expose message headers as request attributes; eager runs
+    (task_always_eager, apply()) keep them under request.headers.
+    """
+    value = request.get(name)
+    if value is None:
+        value = (request.headers or {}).get(name)
+    return value
+
+
+# Profiles in progress, keyed by task id (prerun and postrun share a thread)
+_task_profiles = {}
+
+
+@task_prerun.connect
+def _start_task_profile(task_id=None, task=None, **kwargs):
+    """Profile sampled tasks; send with headers={"profile": True} to force one"""
+    forced = bool(request_header(task.request, "profile"))
+    capture = profiler_service.start(forced)
+    if capture is not None:
+        _task_profiles[task_id] = capture
+
+
+@task_postrun.connect
+def _finish_task_profile(task_id=None, task=None, **kwargs):
+    profiler_service.finish(_task_profiles.pop(task_id, None), "task", task.name)
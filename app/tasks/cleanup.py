@@ -0,0 +1,235 @@
+"""
+Celery Tasks for Document Cleanup and Storage Garbage Collection
+"""
+from app.tasks.celery_app import celery_app
+from app.database import SessionLocal
+from app.models.document import Document, DocumentStatus, DocumentChunk, ChunkLshBand
+from app.models.job import DeletionJob, JobStatus
+from app.services.storage import storage_service
+from app.services.counters import status_counters
+from app.services.cache import document_cache
+from app.services.dedup import dedup_service
+from app.config import settings
+from sqlalchemy import delete, select
+from datetime import datetime, timedelta
+from typing import Tuple
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_documents(db, rows, doc_status: DocumentStatus, *conditions) -> Tuple[int, int]:
+    """
+    Remove files and rows for a batch of documents in one status (caller commits)
+    
+    rows are candidates: the ones still matching are locked and re-read
+    first, so a document that changed meanwhile (say a failed document a
+    retry moved back to processing) keeps its file. Files go before rows:
+    a crash between the two steps leaves rows that are retried, never
+    files without a row pointing at them. Rows are only deleted while they
+    still match conditions, so concurrent runs cannot double-count.
+    
+    Returns:
+        tuple: (rows deleted, bytes of files removed)
+    """
+    matching = db.execute(
+        select(Document.upload_id, Document.file_path, Document.file_size).where(
+            Document.upload_id.in_([row.upload_id for row in rows]),
+            Document.status == doc_status,
+            *conditions
+        ).with_for_update()
+    ).all()
+    for row in matching:
+        storage_service.delete_file(row.file_path)
+    upload_ids = [row.upload_id for row in matching]
+    
+    # Surviving duplicates take over the originals before their bands go
+    dedup_service.release(db, upload_ids)
+    # Explicit rather than ON DELETE CASCADE, which SQLite only honours
+    # with foreign keys enabled; vector index entries would go here too
+    db.execute(delete(ChunkLshBand).where(ChunkLshBand.upload_id.in_(upload_ids)))
+    db.execute(delete(DocumentChunk).where(DocumentChunk.upload_id.in_(upload_ids)))
+    
+    deleted = db.execute(
+        delete(Document).where(
+            Document.upload_id.in_(upload_ids),
+            Document.status == doc_status,
+            *conditions
+        )
+    ).rowcount
+    status_counters.adjust(db, {doc_status: -deleted})
+    return deleted, sum(row.file_size for row in matching)
+
+
+@celery_app.task(bind=True, max_retries=3)
+def purge_deletion_job(self, job_id: str):
+    """
+    Background task that removes documents marked by a bulk deletion job
+    
+    Works through the job's rows in throttled batches: files are unlinked,
+    then the rows are deleted and progress is committed. Re-running a job
+    (retry or resume) only touches rows that are still present.
+    
+    Args:
+        job_id: UUID string of the deletion job
+    """
+    db = SessionLocal()
+    
+    try:
+        job = db.query(DeletionJob).filter(DeletionJob.job_id == job_id).first()
+        
+        if not job:
+            logger.error(f"Deletion job {job_id} not found")
+            return {"status": "error", "message": "Deletion job not found"}
+        
+        if job.status == JobStatus.COMPLETED:
+            return {"status": "success", "job_id": job_id, "processed": job.processed}
+        
+        job.status = JobStatus.RUNNING
+        db.commit()
+        
+        while True:
+            batch = db.query(
+                Document.upload_id, Document.file_path, Document.file_size
+            ).filter(
+                Document.deletion_job_id == job_id
+            ).limit(settings.DELETION_BATCH_SIZE).all()
+            
+            if not batch:
+                break
+            
+            deleted, freed = _delete_documents(
+                db, batch, DocumentStatus.DELETING, Document.deletion_job_id == job_id
+            )
+            job.processed += deleted
+            job.bytes_freed += freed
+            db.commit()
+            document_cache.invalidate_sync(*(row.upload_id for row in batch))
+            
+            if len(batch) == settings.DELETION_BATCH_SIZE:
+                time.sleep(settings.DELETION_BATCH_DELAY)
+        
+        job.status = JobStatus.COMPLETED
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        
+        logger.info(f"Deletion job {job_id} purged {job.processed} documents")
+        
+        return {"status": "success", "job_id": job_id, "processed": job.processed}
+    
+    except Exception as e:
+        logger.error(f"Error purging deletion job {job_id}: {str(e)}", exc_info=True)
+        
+        db.rollback()
+        job = db.query(DeletionJob).filter(DeletionJob.job_id == job_id).first()
+        if job:
+            job.status = JobStatus.FAILED
+            job.error_message = str(e)
+            db.commit()
+        
+        raise self.retry(exc=e, countdown=60)
+    
+    finally:
+        db.close()
+
+
+@celery_app.task
+def resume_deletion_jobs():
+    """
+    Periodic task that re-dispatches deletion jobs that stopped making progress
+    
+    Covers jobs whose enqueue failed, whose worker died, or whose retries
+    ran out.
+    """
+    db = SessionLocal()
+    
+    try:
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.DELETION_STALE_AFTER)
+        job_ids = [
+            row.job_id for row in db.query(DeletionJob.job_id).filter(
+                DeletionJob.status != JobStatus.COMPLETED,
+                DeletionJob.updated_at < stale_before
+            )
+        ]
+    finally:
+        db.close()
+    
+    for job_id in job_ids:
+        logger.warning(f"Resuming stalled deletion job {job_id}")
+        purge_deletion_job.delay(job_id)
+    
+    return {"status": "success", "resumed": job_ids}
+
+
+@celery_app.task
+def collect_garbage():
+    """
+    Periodic task that reclaims storage
+    
+    1. Removes upload directories with no matching document row (e.g. an
+       upload whose DB commit failed), once older than GC_ORPHAN_GRACE_PERIOD
+       so in-flight uploads are left alone. The storage tree is streamed and
+       checked against the database in batches.
+    2. Deletes documents older than GC_RETENTION_DAYS for their status.
+    """
+    db = SessionLocal()
+    report = {"orphans_removed": 0, "expired_removed": 0, "bytes_reclaimed": 0}
+    
+    try:
+        grace_cutoff = time.time() - settings.GC_ORPHAN_GRACE_PERIOD
+        batch = []
+        for entry in storage_service.iter_upload_dirs():
+            if entry[2] < grace_cutoff:
+                batch.append(entry)
+            if len(batch) >= settings.BULK_QUERY_BATCH_SIZE:
+                _remove_orphans(db, batch, report)
+                batch = []
+        if batch:
+            _remove_orphans(db, batch, report)
+        
+        for status_name, days in settings.GC_RETENTION_DAYS.items():
+            doc_status = DocumentStatus(status_name)
+            cutoff = datetime.utcnow() - timedelta(days=days)
+            while True:
+                rows = db.query(
+                    Document.upload_id, Document.file_path, Document.file_size
+                ).filter(
+                    Document.status == doc_status,
+                    Document.created_at < cutoff
+                ).limit(settings.DELETION_BATCH_SIZE).all()
+                
+                if not rows:
+                    break
+                
+                deleted, freed = _delete_documents(
+                    db, rows, doc_status, Document.created_at < cutoff
+                )
+                db.commit()
+                document_cache.invalidate_sync(*(row.upload_id for row in rows))
+                report["expired_removed"] += deleted
+                report["bytes_reclaimed"] += freed
+        
+        logger.info(
+            f"Garbage collection removed {report['orphans_removed']} orphaned uploads and "
+            f"{report['expired_removed']} expired documents, reclaiming "
+            f"{report['bytes_reclaimed']} bytes"
+        )
+        return {"status": "success", **report}
+    
+    finally:
+        db.close()
+
+
+def _remove_orphans(db, entries, report) -> None:
+    """Delete the upload directories in entries that no document row references"""
+    names = [name for name, _, _ in entries]
+    known = {
+        row.upload_id for row in db.query(Document.upload_id).filter(
+            Document.upload_id.in_(names)
+        )
+    }
+    for name, path, _ in entries:
+        if name not in known:
+            report["bytes_reclaimed"] += storage_service.remove_upload_dir(path)
+            report["orphans_removed"] += 1
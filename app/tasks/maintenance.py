@@ -0,0 +1,28 @@
+"""
+Celery Tasks for Periodic Maintenance
+"""
+from app.tasks.celery_app import celery_app
+from app.database import SessionLocal
+from app.services.counters import status_counters
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task
+def reconcile_status_counts():
+    """
+    Periodic task that corrects drift in the per-status document counters
+    """
+    db = SessionLocal()
+    
+    try:
+        drift = status_counters.reconcile(db)
+        if drift:
+            logger.warning(f"Corrected status counter drift: {drift}")
+        return {
+            "status": "success",
+            "drift": {doc_status.value: delta for doc_status, delta in drift.items()}
+        }
+    finally:
+        db.close()
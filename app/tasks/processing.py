@@ -1,18 +1,67 @@
 """
 Celery Tasks for Document Processing
 """
-from app.tasks.celery_app import celery_app
+from app.tasks.celery_app import celery_app, request_header
 from app.database import SessionLocal
-from app.models.document import Document, DocumentStatus
-from datetime import datetime
+from app.config import settings
+from app.models.document import Document, DocumentStatus, DocumentChunk, ChunkLshBand
+from app.services.counters import status_counters
+from app.services.cache import document_cache
+from app.services.metrics import (
+    EXTRACTION_DURATION, EXTRACTION_PAGE_DURATION, CHUNKING_DURATION,
+    DB_COMMIT_DURATION, QUEUE_WAIT, DUPLICATE_CHUNKS, DEDUP_RATIO
+)
+from app.services.tracing import Trace, SPAN_KIND_CONSUMER
+from app.services.dedup import dedup_service
+from sqlalchemy import delete, insert, select, update
+from datetime import datetime, timezone
 import logging
-
-# Document processing libraries
-import pdfplumber
-from docx import Document as DocxDocument
+import time
 
 logger = logging.getLogger(__name__)
 
+# Short metric labels per MIME type
+FILE_TYPE_LABELS = {
+    'application/pdf': 'pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'text/plain': 'txt',
+}
+
+
+def _move_document(db, upload_id: str, from_status: DocumentStatus,
+                   to_status: DocumentStatus, **values) -> bool:
+    """
+    Conditionally move a document to a new status and adjust the counters
+    
+    The UPDATE only matches while the row is still in from_status, so a
+    document marked `deleting` by a bulk delete in the meantime keeps that
+    status and the counters are left alone. Returns whether the row moved.
+    """
+    moved = db.execute(
+        update(Document)
+        .where(Document.upload_id == upload_id, Document.status == from_status)
+        .values(status=to_status, **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if moved and from_status != to_status:
+        status_counters.adjust(db, {from_status: -1, to_status: 1})
+    return bool(moved)
+
+
+def _current_metadata(db, upload_id: str) -> dict:
+    """
+    doc_metadata as committed right now, locked until the caller commits
+    
+    The upload request merges its own spans in after enqueueing, possibly
+    while this task runs, so the task re-reads before writing.
+    """
+    metadata = db.execute(
+        select(Document.doc_metadata)
+        .where(Document.upload_id == upload_id)
+        .with_for_update()
+    ).scalar()
+    return dict(metadata or {})
+
 
 @celery_app.task(bind=True, max_retries=3)
 def process_document(self, upload_id: str):
@@ -21,8 +70,24 @@ def process_document(self, upload_id: str):
     
     Args:
         upload_id: UUID string of the uploaded document
+    
+    Continues the upload's trace when the message carries trace_id and
+    parent_span_id headers; stage timings land in doc_metadata["trace"],
+    together with the upload spans passed in upload_timings. queue_wait
+    starts at the enqueued_ns header, or at created_at without it.
     """
     db = SessionLocal()
+    document = None
+    current_status = None
+    trace = Trace(
+        request_header(self.request, "trace_id"),
+        request_header(self.request, "parent_span_id")
+    )
+    trace.merge_timings(request_header(self.request, "upload_timings"))
+    task_span = trace.start_span(
+        "process_document", kind=SPAN_KIND_CONSUMER,
+        **{"document.upload_id": upload_id, "celery.retries": self.request.retries or 0}
+    )
     
     try:
         # 1. Fetch document from database
@@ -34,55 +99,139 @@ def process_document(self, upload_id: str):
             logger.error(f"Document {upload_id} not found")
             return {"status": "error", "message": "Document not found"}
         
+        if document.status == DocumentStatus.DELETING:
+            logger.info(f"Skipping document {upload_id}: pending deletion")
+            return {"status": "skipped", "message": "Document pending deletion"}
+        
         logger.info(f"Processing document {upload_id}: {document.filename}")
+        current_status = document.status
+        dedup_report = None
+        if self.request.retries == 0:
+            QUEUE_WAIT.observe((datetime.utcnow() - document.created_at).total_seconds())
+            enqueued_ns = request_header(self.request, "enqueued_ns") or int(
+                document.created_at.replace(tzinfo=timezone.utc).timestamp() * 1e9
+            )
+            trace.add_span("queue_wait", enqueued_ns, task_span.start_ns)
         
         # 2. Update status to processing
-        document.status = DocumentStatus.PROCESSING
-        db.commit()
+        if not _move_document(db, upload_id, current_status, DocumentStatus.PROCESSING):
+            db.rollback()
+            logger.info(f"Skipping document {upload_id}: status changed before processing")
+            return {"status": "skipped", "message": "Document status changed"}
+        with DB_COMMIT_DURATION.labels(operation="processing_start").time(), trace.span("commit_processing"):
+            db.commit()
+        current_status = DocumentStatus.PROCESSING
+        document_cache.invalidate_sync(upload_id)
         
         # 3. Extract text from file
-        text_content = extract_text(document.file_path, document.file_type)
+        file_type_label = FILE_TYPE_LABELS.get(document.file_type, 'other')
+        with EXTRACTION_DURATION.labels(file_type=file_type_label).time():
+            with trace.span("extract_text", **{"document.file_type": file_type_label}):
+                text_content = extract_text(document.file_path, document.file_type)
         logger.info(f"Extracted {len(text_content)} characters from {document.filename}")
         
         # 4. Chunk the text
-        chunks = chunk_text(text_content)
-        document.chunk_count = len(chunks)
+        with CHUNKING_DURATION.time(), trace.span("chunk_text"):
+            chunks = chunk_text(text_content)
         logger.info(f"Created {len(chunks)} chunks")
         
+        # Flag near-duplicates of chunks already in the corpus
+        band_rows = []
+        if settings.DEDUP_ENABLED and chunks:
+            with trace.span("dedup_chunks"):
+                band_rows = dedup_service.annotate(db, upload_id, chunks)
+            report = dedup_service.summary(chunks)
+            dedup_report = report
+            DUPLICATE_CHUNKS.inc(report["duplicates"])
+            DEDUP_RATIO.observe(report["ratio"])
+            logger.info(f"{report['duplicates']} of {len(chunks)} chunks are near-duplicates")
+        
+        # Store chunks for export; a retry replaces the previous attempt's rows
+        with trace.span("store_chunks"):
+            dedup_service.release(db, [upload_id])
+            db.execute(delete(ChunkLshBand).where(ChunkLshBand.upload_id == upload_id))
+            db.execute(delete(DocumentChunk).where(DocumentChunk.upload_id == upload_id))
+            if chunks:
+                db.execute(insert(DocumentChunk), [
+                    {"upload_id": upload_id, **chunk} for chunk in chunks
+                ])
+            if band_rows:
+                db.execute(insert(ChunkLshBand), band_rows)
+        
         # 5. Generate embeddings (placeholder for now)
         # In a real implementation, you would:
         # - Call an embedding API (OpenAI, Cohere, etc.)
+        #   for chunks without duplicate_of_upload_id; duplicates reuse the
+        #   embedding of the chunk they point at
         # - Store embeddings in a vector database
         # embeddings = generate_embeddings(chunks)
         # store_in_vector_db(upload_id, chunks, embeddings)
         
-        # 6. Update status to completed
-        document.status = DocumentStatus.COMPLETED
-        document.processed_at = datetime.utcnow()
-        db.commit()
+        # 6. Update status to completed, unless a bulk delete claimed the
+        # document meanwhile; rolling back also discards the stored chunks
+        metadata = _current_metadata(db, upload_id)
+        if dedup_report is not None:
+            metadata["dedup"] = dedup_report
+        completed = _move_document(
+            db, upload_id, DocumentStatus.PROCESSING, DocumentStatus.COMPLETED,
+            chunk_count=len(chunks),
+            processed_at=datetime.utcnow(),
+            doc_metadata=trace.annotate(metadata)
+        )
+        if not completed:
+            db.rollback()
+            logger.info(f"Discarding results for {upload_id}: marked for deletion while processing")
+            return {"status": "skipped", "message": "Document pending deletion"}
+        with DB_COMMIT_DURATION.labels(operation="processing_complete").time(), trace.span("commit_completed"):
+            db.commit()
+        document_cache.invalidate_sync(upload_id)
         
         logger.info(f"Document {upload_id} processed successfully")
         
         return {
             "status": "success",
             "upload_id": upload_id,
-            "chunk_count": document.chunk_count
+            "chunk_count": len(chunks)
         }
         
     except Exception as e:
         logger.error(f"Error processing document {upload_id}: {str(e)}", exc_info=True)
         
-        # Update status to failed
-        if document:
-            document.status = DocumentStatus.FAILED
-            document.error_message = str(e)
+        trace.end_span(task_span, e)
+        
+        # Update status to failed (left alone if it is being deleted)
+        if current_status is not None:
+            db.rollback()
+            failed = _move_document(
+                db, upload_id, current_status, DocumentStatus.FAILED,
+                error_message=str(e),
+                doc_metadata=trace.annotate(_current_metadata(db, upload_id))
+            )
             db.commit()
+            if failed:
+                document_cache.invalidate_sync(upload_id)
         
         # Retry the task
         raise self.retry(exc=e, countdown=60)
         
     finally:
         db.close()
+        trace.end_span(task_span)
+        trace.export()
+
+
+def preload_parsers() -> None:
+    """
+    Import the document parsers ahead of the first task
+    
+    pdfplumber and python-docx are imported lazily so the API and short
+    maintenance tasks never pay for them. Workers call this once in the
+    parent process (WORKER_PRELOAD_PARSERS) so forked children inherit the
+    loaded modules instead of importing them on their first document.
+    """
+    import pdfplumber  # noqa: F401
+    import pdfminer.high_level  # noqa: F401
+    import docx  # noqa: F401
 
 
 def extract_text(file_path: str, file_type: str) -> str:
@@ -98,16 +247,24 @@ def extract_text(file_path: str, file_type: str) -> str:
     """
     try:
         if file_type == 'application/pdf':
-            # Extract from PDF
+            # Extract from PDF (parsers are imported on first use, see preload_parsers)
+            import pdfplumber
+            
+            pages = []
             with pdfplumber.open(file_path) as pdf:
-                text = '\n\n'.join(
-                    page.extract_text() or '' 
-                    for page in pdf.pages
-                )
+                for page in pdf.pages:
+                    started = time.perf_counter()
+                    pages.append(page.extract_text() or '')
+                    EXTRACTION_PAGE_DURATION.labels(file_type='pdf').observe(
+                        time.perf_counter() - started
+                    )
+            text = '\n\n'.join(pages)
             return text
         
         elif file_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
             # Extract from DOCX
+            from docx import Document as DocxDocument
+            
             doc = DocxDocument(file_path)
             text = '\n\n'.join(
                 paragraph.text 
@@ -0,0 +1,59 @@
+"""
+Benchmark Comparison
+Compares two result files from benchmarks.run and flags regressions
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value in the candidate is a regression
+LOWER_IS_BETTER = ("p50_ms", "p99_ms", "peak_memory_kib")
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    """Return (case, metric, old, new, change) for every metric beyond threshold"""
+    regressions = []
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        for metric in LOWER_IS_BETTER:
+            if old.get(metric) and metric in new:
+                change = (new[metric] - old[metric]) / old[metric]
+                print(f"{name:40} {metric:16} {old[metric]:10.2f} -> {new[metric]:10.2f} "
+                      f"({change:+.1%})")
+                if change > threshold:
+                    regressions.append((name, metric, old[metric], new[metric], change))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown that counts as a regression (default 0.10)")
+    args = parser.parse_args()
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    
+    print(f"📊 {baseline['meta']['commit']} -> {candidate['meta']['commit']}\n")
+    regressions = compare(baseline, candidate, args.threshold)
+    
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for name, metric, old, new, change in regressions:
+            print(f"   {name} {metric}: {old:.2f} -> {new:.2f} ({change:+.1%})")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
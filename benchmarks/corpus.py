@@ -0,0 +1,96 @@
+"""
+Synthetic Corpus Generator
+Builds PDF, DOCX and TXT files of controlled size without network access
+or extra dependencies (PDFs are written directly in PDF syntax)
+"""
+import io
+import random
+from typing import List
+
+# Small fixed vocabulary so text looks like prose to the chunker
+WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or "
+    "his from at which but have an they you were her she there been one all we "
+    "their has would when if so no will more can about said what up out them "
+    "document retrieval embedding vector index chunk query context answer model"
+).split()
+
+
+def make_words(count: int, seed: int = 0) -> List[str]:
+    """Deterministic pseudo-random word sequence"""
+    rng = random.Random(seed)
+    return [rng.choice(WORDS) for _ in range(count)]
+
+
+def make_txt(words: int, seed: int = 0) -> bytes:
+    """Plain text with a paragraph break every 120 words"""
+    tokens = make_words(words, seed)
+    paragraphs = [" ".join(tokens[i:i + 120]) for i in range(0, len(tokens), 120)]
+    return "\n\n".join(paragraphs).encode("utf-8")
+
+
+def make_docx(paragraphs: int, words_per_paragraph: int = 120, seed: int = 0) -> bytes:
+    """DOCX with the given number of paragraphs"""
+    from docx import Document as DocxDocument
+    
+    tokens = make_words(paragraphs * words_per_paragraph, seed)
+    doc = DocxDocument()
+    for i in range(paragraphs):
+        start = i * words_per_paragraph
+        doc.add_paragraph(" ".join(tokens[start:start + words_per_paragraph]))
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf(pages: int, lines_per_page: int = 50, words_per_line: int = 12, seed: int = 0) -> bytes:
+    """Text-only PDF with Helvetica lines, one content stream per page"""
+    tokens = make_words(pages * lines_per_page * words_per_line, seed)
+    objects = []
+    
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+    
+    catalog = add(b"")  # filled in once the page tree exists
+    page_tree = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    page_ids = []
+    for page in range(pages):
+        lines = []
+        for line in range(lines_per_page):
+            start = (page * lines_per_page + line) * words_per_line
+            lines.append(" ".join(tokens[start:start + words_per_line]))
+        text_ops = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(
+            f"({text}) Tj T*" for text in lines
+        ) + " ET"
+        stream = text_ops.encode("latin-1")
+        content = add(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (page_tree, font, content)
+        ))
+    
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[page_tree - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % page_tree
+    
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(
+        b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, catalog, xref)
+    )
+    return out.getvalue()
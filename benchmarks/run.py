@@ -0,0 +1,264 @@
+"""
+Ingestion Benchmark Suite
+Measures the ingestion hot paths on a synthetic corpus and stores the
+results as JSON for comparison between commits
+
+Usage:
+    python -m benchmarks.run                 # full suite
+    python -m benchmarks.run --quick         # fewer iterations, smaller corpus
+    python -m benchmarks.run --only extract  # cases whose name contains "extract"
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Isolate the app from any local database, uploads or Redis before importing it
+_WORKDIR = tempfile.mkdtemp(prefix="rag_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_WORKDIR}/bench.db"
+os.environ["UPLOAD_DIR"] = f"{_WORKDIR}/uploads"
+os.environ["DOCUMENT_CACHE_BACKEND"] = "none"
+
+from benchmarks import corpus  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TXT = "text/plain"
+
+
+class Case:
+    """A named benchmark: setup() once, then time run() repeatedly"""
+    
+    def __init__(self, name, run, setup=None, nbytes=0):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.nbytes = nbytes
+
+
+def measure(case: Case, iterations: int) -> dict:
+    """Latency percentiles, throughput and peak traced memory for one case"""
+    if case.setup:
+        case.setup()
+    case.run()  # warm-up
+    
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        case.run()
+        latencies.append(time.perf_counter() - start)
+    
+    # Separate traced run: tracemalloc slows execution down
+    tracemalloc.start()
+    case.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    mean = statistics.fmean(latencies)
+    result = {
+        "iterations": iterations,
+        "mean_ms": mean * 1000,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "ops_per_s": 1 / mean,
+        "peak_memory_kib": peak / 1024,
+    }
+    if case.nbytes:
+        result["input_bytes"] = case.nbytes
+        result["mb_per_s"] = case.nbytes / mean / 1e6
+    return result
+
+
+def write_corpus(directory: Path, quick: bool) -> dict:
+    """Generate the synthetic corpus; sizes are fixed so runs are comparable"""
+    scale = 1 if quick else 5
+    specs = {
+        "pdf_small": (PDF, corpus.make_pdf(pages=2 * scale)),
+        "pdf_large": (PDF, corpus.make_pdf(pages=20 * scale)),
+        "docx_small": (DOCX, corpus.make_docx(paragraphs=20 * scale)),
+        "docx_large": (DOCX, corpus.make_docx(paragraphs=200 * scale)),
+        "txt_small": (TXT, corpus.make_txt(words=2_000 * scale)),
+        "txt_large": (TXT, corpus.make_txt(words=100_000 * scale)),
+    }
+    files = {}
+    for name, (file_type, content) in specs.items():
+        path = directory / name
+        path.write_bytes(content)
+        files[name] = (str(path), file_type, content)
+    return files
+
+
+# Cold-start scripts, each run in a fresh interpreter
+STARTUP_SCRIPTS = {
+    "import_api": "import app.main",
+    "import_worker": (
+        "from app.tasks.celery_app import celery_app; "
+        "celery_app.loader.import_default_modules()"
+    ),
+    "api_first_response": (
+        "from fastapi.testclient import TestClient; from app.main import app\n"
+        "with TestClient(app) as client: client.get('/health').raise_for_status()"
+    ),
+}
+
+
+def build_startup_cases() -> list:
+    """Time interpreter start to import/first response; memory is not tracked here"""
+    root = Path(__file__).resolve().parent.parent
+    
+    def run_script(script):
+        subprocess.run([sys.executable, "-c", script], cwd=root, check=True,
+                       stdout=subprocess.DEVNULL)
+    
+    return [
+        Case(f"startup/{name}", lambda script=script: run_script(script))
+        for name, script in STARTUP_SCRIPTS.items()
+    ]
+
+
+def build_cases(quick: bool) -> list:
+    from fastapi import UploadFile
+    from fastapi.testclient import TestClient
+    
+    from app.database import Base, engine
+    from app.main import app
+    from app.services.storage import storage_service
+    from app.tasks.celery_app import celery_app
+    from app.tasks.processing import extract_text, chunk_text
+    
+    # Uploads enqueue process_document; keep messages in-process
+    celery_app.conf.update(broker_url="memory://", result_backend="cache+memory://")
+    Base.metadata.create_all(bind=engine)
+    corpus_dir = Path(_WORKDIR) / "corpus"
+    corpus_dir.mkdir()
+    files = write_corpus(corpus_dir, quick)
+    cases = []
+    
+    for name, (path, file_type, content) in files.items():
+        cases.append(Case(
+            f"extract_text/{name}",
+            lambda path=path, file_type=file_type: extract_text(path, file_type),
+            nbytes=len(content)
+        ))
+    
+    for name in ("txt_small", "txt_large"):
+        text = files[name][2].decode()
+        cases.append(Case(
+            f"chunk_text/{name}", lambda text=text: chunk_text(text), nbytes=len(text)
+        ))
+    
+    for size_mb in (1, 20):
+        payload = b"x" * (size_mb * 1024 * 1024)
+        
+        def save(payload=payload):
+            upload = UploadFile(file=io.BytesIO(payload), filename="bench.bin")
+            path = asyncio.run(storage_service.save_file("bench", upload))
+            os.unlink(path)
+        
+        cases.append(Case(f"save_file/{size_mb}mb", save, nbytes=len(payload)))
+    
+    client = TestClient(app)
+    upload_body = files["txt_small"][2]
+    
+    def upload():
+        response = client.post(
+            "/api/v1/upload", files={"file": ("bench.txt", upload_body, TXT)}
+        )
+        assert response.status_code == 202, response.text
+    
+    def seed_documents():
+        for _ in range(100 if quick else 500):
+            upload()
+    
+    cases.append(Case("endpoint/upload_txt", upload, nbytes=len(upload_body)))
+    cases.append(Case(
+        "endpoint/list_100",
+        lambda: client.get("/api/v1/documents", params={"limit": 100}).raise_for_status(),
+        setup=seed_documents
+    ))
+    
+    page = {"limit": 100, "total": "none"}
+    
+    def find_second_page():
+        """Cursor past the first page, seeding documents until there is one"""
+        while True:
+            next_cursor = client.get("/api/v1/documents", params=page).json()["next_cursor"]
+            if next_cursor:
+                page["cursor"] = next_cursor
+                return
+            seed_documents()
+    
+    cases.append(Case(
+        "endpoint/list_100_cursor_no_total",
+        lambda: client.get("/api/v1/documents", params=page).raise_for_status(),
+        setup=find_second_page
+    ))
+    return cases
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion hot paths")
+    parser.add_argument("--quick", action="store_true", help="smaller corpus, fewer iterations")
+    parser.add_argument("--iterations", type=int, help="timed iterations per case")
+    parser.add_argument("--only", help="run cases whose name contains this string")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+    
+    iterations = args.iterations or (5 if args.quick else 20)
+    commit = git_commit()
+    cases = [
+        case for case in build_startup_cases() + build_cases(args.quick)
+        if not args.only or args.only in case.name
+    ]
+    
+    results = {}
+    for case in cases:
+        results[case.name] = measure(case, iterations)
+        stats = results[case.name]
+        print(f"{case.name:40} p50 {stats['p50_ms']:9.2f} ms  p99 {stats['p99_ms']:9.2f} ms  "
+              f"peak {stats['peak_memory_kib']:9.0f} KiB")
+    
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n💾 Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Database Concurrency Benchmark
+Compares a plain engine against the tuned backend profile under mixed
+reader/writer load (API reads racing worker status updates)
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_engine_from_profile
+from app.models.document import Document, DocumentStatus
+from app.services.counters import status_counters
+
+
+def writer(Session, stop, latencies, errors):
+    """Insert a document and move it through its statuses, like upload + worker"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        db = Session()
+        try:
+            document = Document(
+                upload_id=str(uuid.uuid4()),
+                filename="bench.txt",
+                file_type="text/plain",
+                file_size=1024,
+                file_path="/dev/null",
+                status=DocumentStatus.PENDING,
+                created_at=datetime.utcnow(),
+                doc_metadata={}
+            )
+            db.add(document)
+            status_counters.adjust(db, {DocumentStatus.PENDING: 1})
+            db.commit()
+            for new_status in (DocumentStatus.PROCESSING, DocumentStatus.COMPLETED):
+                status_counters.transition(db, document, new_status)
+                db.commit()
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            db.rollback()
+            errors.append(1)
+        finally:
+            db.close()
+
+
+def reader(Session, stop, latencies, errors):
+    """Run the listing query the API serves most"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        db = Session()
+        try:
+            db.execute(
+                select(Document.upload_id, Document.status)
+                .where(Document.status == DocumentStatus.COMPLETED)
+                .order_by(Document.created_at.desc())
+                .limit(20)
+            ).all()
+            db.scalar(select(func.count()).select_from(Document))
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            errors.append(1)
+        finally:
+            db.close()
+
+
+def run(engine, writers: int, readers: int, duration: float) -> dict:
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    stop = threading.Event()
+    results = {"write": ([], []), "read": ([], [])}
+    
+    threads = [
+        threading.Thread(target=writer, args=(Session, stop, *results["write"]))
+        for _ in range(writers)
+    ] + [
+        threading.Thread(target=reader, args=(Session, stop, *results["read"]))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    
+    summary = {}
+    for kind, (latencies, errors) in results.items():
+        latencies.sort()
+        p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else float("nan")
+        summary[kind] = {
+            "ops_per_s": len(latencies) / duration,
+            "p50_ms": statistics.median(latencies) if latencies else float("nan"),
+            "p99_ms": p99,
+            "errors": len(errors),
+        }
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Mixed read/write database benchmark")
+    parser.add_argument("--url", help="database URL (default: fresh SQLite files in a temp dir)")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    args = parser.parse_args()
+    
+    tmpdir = tempfile.mkdtemp(prefix="db_bench_")
+    for name in ("default", "profile"):
+        url = args.url or f"sqlite:///{os.path.join(tmpdir, name + '.db')}"
+        if name == "default":
+            engine = create_engine(url, pool_size=args.writers + args.readers)
+        else:
+            engine = create_engine_from_profile(url, pool_size=args.writers + args.readers)
+        summary = run(engine, args.writers, args.readers, args.duration)
+        
+        print(f"📊 {name} engine ({url})")
+        for kind, stats in summary.items():
+            print(f"   {kind:5}: {stats['ops_per_s']:8.1f} ops/s  p50 {stats['p50_ms']:7.1f} ms  "
+                  f"p99 {stats['p99_ms']:7.1f} ms  errors {stats['errors']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Chunk Export Script
+Writes stored chunks to a file (or stdout) for embedding/indexing jobs
+
+Reads straight from the database with a server-side cursor, the same way
+as GET /api/v1/exports/chunks. For incremental exports, pass the
+"next" arguments printed at the end of the previous run.
+
+Usage:
+    python scripts/export_chunks.py --format parquet -o chunks.parquet
+    python scripts/export_chunks.py --since 2024-05-01T12:00:00 --after-id <upload_id> >> chunks.ndjson
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models.document import DocumentStatus
+from app.schemas.export import ExportFormat
+from app.services.export import export_service, ExportFormatUnavailable
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export stored chunks")
+    parser.add_argument("--format", default=ExportFormat.NDJSON.value,
+                        choices=[fmt.value for fmt in ExportFormat], help="Output format (default ndjson)")
+    parser.add_argument("--status", default=DocumentStatus.COMPLETED.value,
+                        choices=[s.value for s in DocumentStatus], help="Document status (default completed)")
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="Only documents processed at or after this ISO timestamp")
+    parser.add_argument("--after-id",
+                        help="With --since, resume strictly after this upload_id")
+    parser.add_argument("--until", type=datetime.fromisoformat,
+                        help="Only documents processed at or before this ISO timestamp")
+    parser.add_argument("-o", "--output", help="Output file (default stdout)")
+    args = parser.parse_args()
+    if args.after_id and not args.since:
+        parser.error("--after-id requires --since")
+    
+    try:
+        encoder = export_service.encoder(ExportFormat(args.format))
+    except ExportFormatUnavailable as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    db = SessionLocal()
+    try:
+        for piece in export_service.iter_export(
+            db, encoder,
+            doc_status=DocumentStatus(args.status),
+            processed_after=args.since,
+            after_upload_id=args.after_id,
+            processed_before=args.until
+        ):
+            out.write(piece)
+    finally:
+        db.close()
+        if args.output:
+            out.close()
+    
+    print(f"✅ Exported {encoder.rows} chunks", file=sys.stderr)
+    if encoder.last_processed_at is not None:
+        print(
+            f"   next: --since {encoder.last_processed_at.isoformat()} --after-id {encoder.last_upload_id}",
+            file=sys.stderr
+        )
+    elif args.since is not None:
+        resume = f" --after-id {args.after_id}" if args.after_id else ""
+        print(f"   next: --since {args.since.isoformat()}{resume}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Database Initialization Script
+Creates missing tables; run once per deployment before starting the API
+
+The API no longer creates tables on startup (unless
+DB_CREATE_TABLES_ON_STARTUP is set), so cold starts skip the schema check.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import init_db
+import app.models.document  # noqa: F401  (register models on Base)
+import app.models.job  # noqa: F401
+
+
+def main() -> int:
+    init_db()
+    print(f"✅ Database initialized ({settings.DATABASE_URL.split('@')[-1]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Load Test Script
+Measures API latency percentiles under concurrent requests
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+
+import httpx
+
+
+async def seed_documents(client: httpx.AsyncClient, count: int) -> list:
+    """Upload small text documents to read back during the test"""
+    upload_ids = []
+    for i in range(count):
+        files = {"file": (f"load_{i}.txt", io.BytesIO(b"load test document " * 50), "text/plain")}
+        response = await client.post("/api/v1/upload", files=files)
+        response.raise_for_status()
+        upload_ids.append(response.json()["upload_id"])
+    return upload_ids
+
+
+async def run_load(base_url: str, concurrency: int, requests: int, seed: int) -> dict:
+    """Fire a mix of list, detail and upload requests with bounded concurrency"""
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        upload_ids = await seed_documents(client, seed)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one_request(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    if i % 10 == 0:
+                        files = {"file": (f"load_{i}.txt", io.BytesIO(b"x" * 1024), "text/plain")}
+                        response = await client.post("/api/v1/upload", files=files)
+                    elif i % 2 == 0:
+                        response = await client.get("/api/v1/documents", params={"limit": 20})
+                    else:
+                        upload_id = upload_ids[i % len(upload_ids)]
+                        response = await client.get(f"/api/v1/documents/{upload_id}")
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append((time.perf_counter() - start) * 1000)
+                if failed:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": quantiles[49],
+        "p95_ms": quantiles[94],
+        "p99_ms": quantiles[98],
+        "max_ms": latencies[-1],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent load test for the ingestion API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=20, help="documents uploaded before the test")
+    args = parser.parse_args()
+
+    print(f"🔥 Load testing {args.base_url} ({args.requests} requests, concurrency {args.concurrency})")
+    result = asyncio.run(run_load(args.base_url, args.concurrency, args.requests, args.seed))
+
+    print(f"   Throughput: {result['throughput_rps']:.1f} req/s")
+    print(f"   p50: {result['p50_ms']:.1f} ms  p95: {result['p95_ms']:.1f} ms  "
+          f"p99: {result['p99_ms']:.1f} ms  max: {result['max_ms']:.1f} ms")
+    print(f"   Errors: {result['errors']}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
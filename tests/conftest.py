@@ -0,0 +1,121 @@
+"""
+Shared test fixtures
+"""
+import io
+import os
+import shutil
+import tempfile
+
+# Point the app (and eagerly-run Celery tasks) at a database and upload tree
+# under a per-session temporary directory, so the suite never writes into the
+# checkout, and keep the document cache in-process so tests do not need Redis
+TEST_DIR = tempfile.mkdtemp(prefix="rag-tests-")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DIR}/test.db"
+os.environ["DATABASE_URL"] = SQLALCHEMY_DATABASE_URL
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_DIR, "uploads")
+os.environ.setdefault("DOCUMENT_CACHE_BACKEND", "memory")
+# Exports include documents processed a moment ago
+os.environ.setdefault("EXPORT_SETTLE_SECONDS", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.main import app
+from app.tasks.celery_app import celery_app
+from app.tasks.processing import process_document
+from app.database import Base, get_db, get_async_db, async_database_url
+
+# Test database
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# TestClient runs each request on a fresh event loop, so async connections
+# must not be pooled across requests
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Recreate test database so schema changes are picked up
+Base.metadata.drop_all(bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Remove the session's database and uploads"""
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def enqueued_documents(monkeypatch):
+    """Capture process_document messages sent on upload instead of using the broker"""
+    from app.api.v1.endpoints.upload import PROCESS_DOCUMENT_TASK
+    
+    sent = []
+    send_task = celery_app.send_task
+    
+    def capture(name, args=None, headers=None, **options):
+        if name != PROCESS_DOCUMENT_TASK:
+            return send_task(name, args=args, headers=headers, **options)
+        sent.append({"args": args, "headers": headers})
+    
+    monkeypatch.setattr(celery_app, "send_task", capture)
+    return sent
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def upload_and_process(client, enqueued_documents):
+    """Upload text as a file and run its processing task; returns the upload_id"""
+    def upload(name: str, text: str) -> str:
+        files = {"file": (f"{name}.txt", io.BytesIO(text.encode()), "text/plain")}
+        upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+        message = enqueued_documents[-1]
+        assert message["args"] == [upload_id]
+        process_document.apply(args=message["args"], headers=message["headers"]).get()
+        return upload_id
+    
+    return upload
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def eager_celery():
+    """Run .delay() calls inline instead of going through the broker"""
+    celery_app.conf.task_always_eager = True
+    try:
+        yield
+    finally:
+        celery_app.conf.task_always_eager = False
@@ -0,0 +1,82 @@
+"""
+Tests for Upload Admission Control
+"""
+import io
+
+import pytest
+
+from app.config import settings
+from app.services.admission import admission_controller
+from app.services.metrics import ADMISSION_REJECTED
+
+
+def upload(client):
+    files = {"file": ("test.txt", io.BytesIO(b"admission control"), "text/plain")}
+    return client.post("/api/v1/upload", files=files)
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    """Fresh buckets and a forced re-sample of queue depth and disk space"""
+    monkeypatch.setattr(admission_controller, "_buckets", {})
+    monkeypatch.setattr(admission_controller, "_sampled_at", 0.0)
+    monkeypatch.setattr(admission_controller, "_drain_rate", None)
+    return monkeypatch
+
+
+def test_client_token_bucket(client, admission):
+    """A client past its burst gets 429 with the time until its next token"""
+    admission.setattr(settings, "ADMISSION_CLIENT_RATE", 0.1)
+    admission.setattr(settings, "ADMISSION_CLIENT_BURST", 2)
+    rejected = ADMISSION_REJECTED.labels(reason="rate_limited")
+    before = rejected._value.get()
+    
+    assert upload(client).status_code == 202
+    assert upload(client).status_code == 202
+    response = upload(client)
+    
+    assert response.status_code == 429
+    assert response.json()["detail"]["error"] == "RATE_LIMITED"
+    assert 1 <= int(response.headers["Retry-After"]) <= 10
+    assert rejected._value.get() == before + 1
+
+
+def test_deep_queue_is_refused(client, admission):
+    """Uploads stop once pending + processing reaches ADMISSION_MAX_QUEUE_DEPTH"""
+    assert upload(client).status_code == 202  # at least one pending document
+    admission.setattr(settings, "ADMISSION_MAX_QUEUE_DEPTH", 1)
+    admission.setattr(admission_controller, "_sampled_at", 0.0)
+    
+    response = upload(client)
+    
+    assert response.status_code == 503
+    assert response.json()["detail"]["error"] == "QUEUE_FULL"
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "rag_admission_queue_depth" in client.get("/metrics").text
+
+
+def test_rejections_carry_cors_headers(client, admission):
+    """Admission runs inside CORS, so browsers can read the 503"""
+    admission.setattr(settings, "ADMISSION_MIN_FREE_BYTES", 1 << 60)
+    files = {"file": ("test.txt", io.BytesIO(b"admission control"), "text/plain")}
+    
+    response = client.post("/api/v1/upload", files=files, headers={"Origin": "https://app.example"})
+    
+    assert response.status_code == 503
+    assert "access-control-allow-origin" in response.headers
+
+
+def test_low_disk_and_inflight_bytes_are_refused(client, admission):
+    """Storage headroom and per-process in-flight bytes are enforced"""
+    admission.setattr(settings, "ADMISSION_MIN_FREE_BYTES", 1 << 60)
+    response = upload(client)
+    assert response.status_code == 503
+    assert response.json()["detail"]["error"] == "INSUFFICIENT_STORAGE"
+    
+    admission.setattr(settings, "ADMISSION_MIN_FREE_BYTES", 0)
+    admission.setattr(settings, "ADMISSION_MAX_INFLIGHT_BYTES", 1024)
+    admission.setattr(admission_controller, "inflight_bytes", 1000)
+    response = upload(client)
+    assert response.status_code == 503
+    assert response.json()["detail"]["error"] == "SERVER_BUSY"
+    assert response.headers["Retry-After"] == "1"
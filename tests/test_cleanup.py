@@ -0,0 +1,106 @@
+"""
+Tests for Cleanup and Garbage Collection Tasks
+"""
+import os
+import time
+import pytest
+from datetime import datetime
+
+from app.models.document import Document, DocumentStatus
+from app.services.storage import storage_service
+from app.tasks.cleanup import collect_garbage
+from tests.test_documents import make_document
+
+
+@pytest.fixture
+def storage_dir(tmp_path, monkeypatch):
+    """Point the storage service at an empty temporary tree"""
+    monkeypatch.setattr(storage_service, "base_dir", tmp_path)
+    return tmp_path
+
+
+def make_upload_dir(base, name, content=b"x" * 100, age=0):
+    """Create an upload directory holding one file, optionally back-dated"""
+    upload_dir = base / name
+    upload_dir.mkdir()
+    file_path = upload_dir / "file.txt"
+    file_path.write_bytes(content)
+    if age:
+        past = time.time() - age
+        os.utime(upload_dir, (past, past))
+    return file_path
+
+
+def test_collect_garbage_removes_old_orphans(storage_dir, db):
+    """Unreferenced directories past the grace period are removed"""
+    referenced = make_document(db)
+    make_upload_dir(storage_dir, referenced.upload_id, age=10 * 3600)
+    make_upload_dir(storage_dir, "orphan-old", age=10 * 3600)
+    make_upload_dir(storage_dir, "orphan-new")
+    
+    report = collect_garbage()
+    
+    assert report["orphans_removed"] == 1
+    assert report["bytes_reclaimed"] >= 100
+    assert not (storage_dir / "orphan-old").exists()
+    assert (storage_dir / "orphan-new").exists()
+    assert (storage_dir / referenced.upload_id).exists()
+
+
+def test_collect_garbage_enforces_retention(storage_dir, db):
+    """FAILED documents past retention are deleted with their files"""
+    file_path = make_upload_dir(storage_dir, "expired")
+    expired = make_document(
+        db, DocumentStatus.FAILED, created_at=datetime(1990, 1, 1), file_path=str(file_path)
+    ).upload_id
+    kept = make_document(db, DocumentStatus.COMPLETED, created_at=datetime(1990, 1, 1)).upload_id
+    
+    report = collect_garbage()
+    
+    assert report["expired_removed"] >= 1
+    assert not file_path.exists()
+    db.expire_all()
+    assert db.get(Document, expired) is None
+    assert db.get(Document, kept) is not None
+
+
+def test_failed_upload_removes_saved_file(client, monkeypatch):
+    """A DB failure after save_file does not leave the file behind"""
+    from app.api.v1.endpoints import upload
+    saved = []
+    original_save = storage_service.save_file
+    
+    async def tracking_save(upload_id, file):
+        saved.append(await original_save(upload_id, file))
+        return saved[-1]
+    
+    def failing_adjust(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+    
+    monkeypatch.setattr(upload.storage_service, "save_file", tracking_save)
+    monkeypatch.setattr(upload.status_counters, "adjust", failing_adjust)
+    files = {"file": ("test.txt", b"orphan candidate", "text/plain")}
+    
+    response = client.post("/api/v1/upload", files=files)
+    
+    assert response.status_code == 500
+    assert saved and not os.path.exists(saved[0])
+
+
+def test_delete_documents_skips_rows_that_changed(storage_dir, db):
+    """A candidate that no longer matches keeps its file and is not counted"""
+    from app.services.counters import status_counters
+    from app.tasks.cleanup import _delete_documents
+    
+    file_path = make_upload_dir(storage_dir, "retried")
+    document = make_document(db, DocumentStatus.FAILED, file_path=str(file_path))
+    rows = db.query(Document.upload_id, Document.file_path, Document.file_size).filter(
+        Document.upload_id == document.upload_id
+    ).all()
+    status_counters.transition(db, document, DocumentStatus.PROCESSING)  # retried meanwhile
+    db.commit()
+    
+    assert _delete_documents(db, rows, DocumentStatus.FAILED) == (0, 0)
+    db.commit()
+    assert file_path.exists()
+    assert db.get(Document, document.upload_id) is not None
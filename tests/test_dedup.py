@@ -0,0 +1,113 @@
+"""
+Tests for Near-Duplicate Chunk Detection
+"""
+import random
+
+import orjson
+import pytest
+
+from app.config import settings
+from app.services.dedup import dedup_service
+
+
+def make_text(seed: int, words: int = 1500) -> list:
+    rng = random.Random(seed)
+    return [f"w{rng.randrange(100000)}" for _ in range(words)]
+
+
+def revise(words: list, every: int = 100) -> list:
+    """Insert a new word every so often, shifting every later chunk boundary"""
+    revised = []
+    for i, word in enumerate(words):
+        if i and i % every == 0:
+            revised.append("revised")
+        revised.append(word)
+    return revised
+
+
+def process_words(client, upload_and_process, name: str, words: list) -> dict:
+    """Upload and process words as one document and return it"""
+    upload_id = upload_and_process(name, " ".join(words))
+    return client.get(f"/api/v1/documents/{upload_id}").json()
+
+
+def chunk_rows(client, upload_id: str) -> list:
+    response = client.get("/api/v1/exports/chunks")
+    return [
+        row for row in map(orjson.loads, response.content.splitlines())
+        if row["upload_id"] == upload_id
+    ]
+
+
+def test_signature_similarity_tracks_overlap():
+    words = make_text(1, 300)
+    signature = dedup_service.signature(" ".join(words))
+    
+    assert dedup_service.similarity(signature, dedup_service.signature(" ".join(words))) == 1.0
+    assert dedup_service.similarity(signature, dedup_service.signature(" ".join(revise(words)))) > 0.8
+    assert dedup_service.similarity(signature, dedup_service.signature(" ".join(make_text(2, 300)))) < 0.1
+
+
+def test_revision_chunks_point_at_original(client, upload_and_process):
+    """A lightly edited revision is flagged chunk by chunk against the original"""
+    words = make_text(10)
+    original = process_words(client, upload_and_process, "original", words)
+    revision = process_words(client, upload_and_process, "revision", revise(words))
+    
+    assert original["doc_metadata"]["dedup"]["duplicates"] == 0
+    report = revision["doc_metadata"]["dedup"]
+    assert report["threshold"] == settings.DEDUP_THRESHOLD
+    assert report["chunks"] == revision["chunk_count"]
+    assert report["ratio"] >= 0.75
+    
+    rows = chunk_rows(client, revision["upload_id"])
+    flagged = [row for row in rows if row["duplicate_of_upload_id"]]
+    assert {row["duplicate_of_upload_id"] for row in flagged} == {original["upload_id"]}
+    assert all(row["duplicate_similarity"] >= settings.DEDUP_THRESHOLD for row in flagged)
+
+
+def test_threshold_is_configurable(client, upload_and_process, monkeypatch):
+    """Raising the threshold above the revision's similarity keeps every chunk"""
+    monkeypatch.setattr(settings, "DEDUP_THRESHOLD", 0.99)
+    words = make_text(20)
+    process_words(client, upload_and_process, "strict", words)
+    revision = process_words(client, upload_and_process, "strict-revision", revise(words, 40))
+    
+    assert revision["doc_metadata"]["dedup"]["ratio"] == 0.0
+
+
+def test_repeated_passage_within_document(client, upload_and_process):
+    """Near-identical chunks of the same document are flagged as well"""
+    passage = make_text(30, 450)
+    document = process_words(client, upload_and_process, "repeated", passage * 3)
+    
+    rows = chunk_rows(client, document["upload_id"])
+    flagged = [row for row in rows if row["duplicate_of_upload_id"]]
+    assert flagged
+    assert {row["duplicate_of_upload_id"] for row in flagged} == {document["upload_id"]}
+    assert all(row["duplicate_of_chunk_index"] < row["chunk_index"] for row in flagged)
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_deleting_original_promotes_a_duplicate(client, upload_and_process, eager_celery, bulk):
+    """The oldest surviving duplicate replaces a deleted original; the rest follow it"""
+    words = make_text(40 + bulk)
+    original = process_words(client, upload_and_process, "doomed-original", words)
+    first = process_words(client, upload_and_process, "first-copy", revise(words))
+    second = process_words(client, upload_and_process, "second-copy", revise(words))
+    assert original["upload_id"] in {
+        row["duplicate_of_upload_id"] for row in chunk_rows(client, second["upload_id"])
+    }
+    
+    if bulk:
+        response = client.post("/api/v1/documents/bulk-delete", json={"upload_ids": [original["upload_id"]]})
+        assert response.status_code == 202
+    else:
+        assert client.delete(f"/api/v1/documents/{original['upload_id']}").status_code == 204
+    
+    assert not any(row["duplicate_of_upload_id"] for row in chunk_rows(client, first["upload_id"]))
+    second_rows = chunk_rows(client, second["upload_id"])
+    assert all(row["duplicate_of_upload_id"] == first["upload_id"] for row in second_rows)
+    
+    third = process_words(client, upload_and_process, "third-copy", revise(words))
+    assert third["doc_metadata"]["dedup"]["ratio"] == 1.0
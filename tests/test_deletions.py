@@ -0,0 +1,170 @@
+"""
+Tests for Bulk Deletion Endpoints
+"""
+import pytest
+from datetime import datetime
+from uuid import uuid4
+
+from app.models.document import Document, DocumentStatus
+from tests.test_documents import make_document
+
+
+def test_bulk_delete_by_ids(client, db, eager_celery):
+    """Documents are purged and the job reports completion"""
+    docs = [make_document(db) for _ in range(3)]
+    upload_ids = [doc.upload_id for doc in docs]
+    total_size = sum(doc.file_size for doc in docs)
+    keep = make_document(db)
+    before = client.get("/api/v1/documents/stats").json()
+    
+    response = client.post("/api/v1/documents/bulk-delete", json={"upload_ids": upload_ids})
+    
+    assert response.status_code == 202
+    job = client.get(f"/api/v1/deletion-jobs/{response.json()['job_id']}").json()
+    assert job["status"] == "completed"
+    assert job["total"] == job["processed"] == 3
+    assert job["bytes_freed"] == total_size
+    
+    db.expire_all()
+    assert db.query(Document).filter(Document.upload_id.in_(upload_ids)).count() == 0
+    assert db.get(Document, keep.upload_id) is not None
+    
+    after = client.get("/api/v1/documents/stats").json()
+    assert after["counts"]["pending"] == before["counts"]["pending"] - 3
+    assert after["counts"]["deleting"] == 0
+
+
+def test_bulk_delete_by_filter(client, db, eager_celery):
+    """Status and created_before are combined"""
+    old_failed = make_document(db, DocumentStatus.FAILED, created_at=datetime(1990, 1, 1)).upload_id
+    old_completed = make_document(db, DocumentStatus.COMPLETED, created_at=datetime(1990, 1, 1)).upload_id
+    
+    response = client.post(
+        "/api/v1/documents/bulk-delete",
+        json={"status": "failed", "created_before": "1991-01-01T00:00:00"}
+    )
+    
+    assert response.json()["total"] == 1
+    db.expire_all()
+    assert db.get(Document, old_failed) is None
+    assert db.get(Document, old_completed) is not None
+
+
+def test_bulk_delete_hides_documents_before_purge(client, db, monkeypatch):
+    """Marked documents disappear from reads before the job runs"""
+    from app.api.v1.endpoints import deletions
+    enqueued = []
+    monkeypatch.setattr(deletions.purge_deletion_job, "delay", enqueued.append)
+    document = make_document(db)
+    
+    response = client.post(
+        "/api/v1/documents/bulk-delete",
+        json={"upload_ids": [document.upload_id]}
+    )
+    
+    assert enqueued == [response.json()["job_id"]]
+    assert response.json()["status"] == "pending"
+    assert client.get(f"/api/v1/documents/{document.upload_id}").status_code == 404
+
+
+def test_bulk_delete_by_filter_drops_cached_documents(client, db, monkeypatch):
+    """Documents matched by a filter are gone from reads even if they were cached"""
+    from app.api.v1.endpoints import deletions
+    monkeypatch.setattr(deletions.purge_deletion_job, "delay", lambda job_id: None)
+    document = make_document(db, DocumentStatus.FAILED, created_at=datetime(1980, 1, 1))
+    assert client.get(f"/api/v1/documents/{document.upload_id}").status_code == 200
+    
+    response = client.post(
+        "/api/v1/documents/bulk-delete",
+        json={"status": "failed", "created_before": "1981-01-01T00:00:00"}
+    )
+    
+    assert response.json()["total"] == 1
+    assert client.get(f"/api/v1/documents/{document.upload_id}").status_code == 404
+
+
+def test_bulk_delete_requires_criteria(client):
+    """An empty request would delete everything and is rejected"""
+    response = client.post("/api/v1/documents/bulk-delete", json={})
+    
+    assert response.status_code == 400
+    assert "EMPTY_CRITERIA" in str(response.json())
+
+
+def test_bulk_delete_while_processing_keeps_counters(client, db, enqueued_documents, monkeypatch):
+    """A worker finishing a document marked for deletion leaves it deleting"""
+    import io
+    from app.api.v1.endpoints import deletions
+    from app.tasks import processing
+    
+    monkeypatch.setattr(deletions.purge_deletion_job, "delay", lambda job_id: None)
+    files = {"file": ("racy.txt", io.BytesIO(b"racing the purge " * 50), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    
+    original_chunk_text = processing.chunk_text
+    
+    def chunk_then_delete(text):
+        client.post("/api/v1/documents/bulk-delete", json={"upload_ids": [upload_id]})
+        return original_chunk_text(text)
+    
+    monkeypatch.setattr(processing, "chunk_text", chunk_then_delete)
+    before = client.get("/api/v1/documents/stats").json()["counts"]
+    
+    result = processing.process_document.apply(args=[upload_id]).get()
+    
+    assert result["status"] == "skipped"
+    db.expire_all()
+    assert db.get(Document, upload_id).status == DocumentStatus.DELETING
+    after = client.get("/api/v1/documents/stats").json()["counts"]
+    assert after["completed"] == before["completed"]
+    assert after["deleting"] == before["deleting"] + 1
+    assert after["pending"] == before["pending"] - 1
+
+
+def test_bulk_delete_caps_and_summarizes_upload_ids(client, db, eager_celery, monkeypatch):
+    """Oversized ID lists are rejected and jobs only keep the count"""
+    from app.config import settings
+    
+    too_many = [str(uuid4()) for _ in range(settings.BULK_DELETE_MAX_IDS + 1)]
+    assert client.post("/api/v1/documents/bulk-delete", json={"upload_ids": too_many}).status_code == 422
+    
+    document = make_document(db)
+    response = client.post("/api/v1/documents/bulk-delete", json={"upload_ids": [document.upload_id, str(uuid4())]})
+    
+    assert response.json()["criteria"] == {"upload_id_count": 2}
+    assert response.json()["total"] == 1
+
+
+def test_bulk_delete_filter_marks_in_batches(client, db, monkeypatch):
+    """Filter deletes lock and count rows batch by batch until none match"""
+    from app.api.v1.endpoints import deletions
+    from app.config import settings
+    monkeypatch.setattr(deletions.purge_deletion_job, "delay", lambda job_id: None)
+    monkeypatch.setattr(settings, "BULK_QUERY_BATCH_SIZE", 2)
+    for doc_status in (DocumentStatus.PENDING, DocumentStatus.FAILED, DocumentStatus.FAILED):
+        make_document(db, doc_status, created_at=datetime(1970, 1, 1))
+    before = client.get("/api/v1/documents/stats").json()["counts"]
+    
+    response = client.post("/api/v1/documents/bulk-delete", json={"created_before": "1970-01-02T00:00:00"})
+    
+    assert response.json()["total"] == 3
+    after = client.get("/api/v1/documents/stats").json()["counts"]
+    assert after["pending"] == before["pending"] - 1
+    assert after["failed"] == before["failed"] - 2
+    assert after["deleting"] == before["deleting"] + 3
+
+
+def test_documents_pending_deletion_are_not_listed_or_totalled(client, db, monkeypatch):
+    """status=deleting is refused and the stats total leaves marked rows out"""
+    from app.api.v1.endpoints import deletions
+    monkeypatch.setattr(deletions.purge_deletion_job, "delay", lambda job_id: None)
+    document = make_document(db)
+    client.post("/api/v1/documents/bulk-delete", json={"upload_ids": [document.upload_id]})
+    
+    response = client.get("/api/v1/documents", params={"status": "deleting"})
+    stats = client.get("/api/v1/documents/stats").json()
+    
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "INVALID_STATUS_FILTER"
+    assert stats["counts"]["deleting"] >= 1
+    assert stats["total"] == sum(stats["counts"].values()) - stats["counts"]["deleting"]
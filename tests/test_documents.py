@@ -0,0 +1,324 @@
+"""
+Tests for Document Management Endpoints
+"""
+import asyncio
+import pytest
+from uuid import uuid4
+from datetime import datetime, timedelta
+import io
+
+from app.models.document import Document, DocumentStatus
+from app.schemas.document import DocumentListResponse
+from app.services.counters import status_counters
+from app.services.cache import document_cache
+from app.tasks.processing import process_document
+
+
+def make_document(db, status=DocumentStatus.PENDING, created_at=None, **kwargs):
+    """Insert a document row directly, bypassing the upload endpoint"""
+    upload_id = str(uuid4())
+    document = Document(
+        upload_id=upload_id,
+        filename=kwargs.pop("filename", "doc.txt"),
+        file_type=kwargs.pop("file_type", "text/plain"),
+        file_size=kwargs.pop("file_size", 10),
+        file_path=kwargs.pop("file_path", f"./uploads/{upload_id}/doc.txt"),
+        status=status,
+        created_at=created_at or datetime.utcnow(),
+        doc_metadata=kwargs.pop("doc_metadata", {}),
+        **kwargs
+    )
+    db.add(document)
+    status_counters.adjust(db, {status: 1})
+    db.commit()
+    return document
+
+
+@pytest.fixture
+def failed_documents(db):
+    """Five FAILED documents with distinct, descending creation times"""
+    base = datetime(2001, 1, 1)
+    docs = [
+        make_document(db, DocumentStatus.FAILED, created_at=base + timedelta(minutes=i))
+        for i in range(5)
+    ]
+    yield sorted(docs, key=lambda d: d.created_at, reverse=True)
+    for doc in docs:
+        status_counters.adjust(db, {doc.status: -1})
+        db.delete(doc)
+    db.commit()
+
+
+def test_list_documents_cursor_pagination(client, failed_documents):
+    """Walking next_cursor visits every row once, newest first"""
+    seen = []
+    params = {"status": "failed", "limit": 2}
+    while True:
+        response = client.get("/api/v1/documents", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(doc["upload_id"] for doc in data["documents"])
+        if not data["next_cursor"]:
+            break
+        params["cursor"] = data["next_cursor"]
+    
+    assert seen == [doc.upload_id for doc in failed_documents]
+
+
+def test_list_documents_skip_total(client, failed_documents):
+    """total=none skips the count"""
+    response = client.get("/api/v1/documents", params={"status": "failed", "total": "none"})
+    
+    assert response.status_code == 200
+    assert response.json()["total"] is None
+
+
+def test_list_documents_invalid_cursor(client):
+    """Garbage cursors are rejected"""
+    response = client.get("/api/v1/documents", params={"cursor": "not-a-cursor"})
+    
+    assert response.status_code == 400
+    assert "INVALID_CURSOR" in str(response.json())
+
+
+def test_document_stats_follow_upload_and_delete(client):
+    """Counters move with uploads and deletes"""
+    before = client.get("/api/v1/documents/stats").json()
+    
+    files = {"file": ("test.txt", io.BytesIO(b"stats content"), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    after_upload = client.get("/api/v1/documents/stats").json()
+    
+    assert after_upload["counts"]["pending"] == before["counts"]["pending"] + 1
+    assert after_upload["total"] == before["total"] + 1
+    
+    client.delete(f"/api/v1/documents/{upload_id}")
+    after_delete = client.get("/api/v1/documents/stats").json()
+    
+    assert after_delete == before
+
+
+def test_reconcile_status_counts_fixes_drift(db):
+    """Reconciliation overwrites drifted counters with real counts"""
+    status_counters.reconcile(db)
+    expected = status_counters.get_counts(db)
+    
+    status_counters.adjust(db, {DocumentStatus.COMPLETED: 7})
+    db.commit()
+    drift = status_counters.reconcile(db)
+    
+    assert drift == {DocumentStatus.COMPLETED: -7}
+    assert status_counters.get_counts(db) == expected
+
+
+def test_get_document_etag_not_modified(client):
+    """Matching If-None-Match returns an empty 304"""
+    files = {"file": ("test.txt", io.BytesIO(b"etag content"), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    
+    first = client.get(f"/api/v1/documents/{upload_id}")
+    etag = first.headers["etag"]
+    second = client.get(f"/api/v1/documents/{upload_id}", headers={"If-None-Match": etag})
+    
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_get_document_cache_invalidated_on_change(client, enqueued_documents):
+    """Processing the document invalidates its cached payload"""
+    files = {"file": ("test.txt", io.BytesIO(b"cached content " * 20), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    first = client.get(f"/api/v1/documents/{upload_id}")
+    assert first.json()["status"] == "pending"
+    
+    process_document.apply(args=enqueued_documents[-1]["args"]).get()
+    second = client.get(
+        f"/api/v1/documents/{upload_id}",
+        headers={"If-None-Match": first.headers["etag"]}
+    )
+    
+    assert second.status_code == 200
+    assert second.json()["status"] == "completed"
+
+
+def test_cache_skips_write_after_concurrent_invalidation():
+    """A read that raced an invalidation does not re-cache its stale payload"""
+    upload_id = str(uuid4())
+    
+    async def read_then_store():
+        payload, generation = await document_cache.get(upload_id)
+        assert payload is None
+        document_cache.invalidate_sync(upload_id)  # worker commits meanwhile
+        await document_cache.set(upload_id, "stale", generation)
+        return await document_cache.get(upload_id)
+    
+    assert asyncio.run(read_then_store())[0] is None
+
+
+def test_bulk_status_lookup(client, db):
+    """One call returns statuses for known IDs and lists unknown ones"""
+    pending = make_document(db)
+    completed = make_document(db, DocumentStatus.COMPLETED, chunk_count=3)
+    unknown = str(uuid4())
+    
+    response = client.post(
+        "/api/v1/documents/status",
+        json={"upload_ids": [pending.upload_id, completed.upload_id, unknown]}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    statuses = {doc["upload_id"]: doc["status"] for doc in data["documents"]}
+    assert statuses == {pending.upload_id: "pending", completed.upload_id: "completed"}
+    assert data["missing"] == [unknown]
+
+
+def test_bulk_status_lookup_rejects_too_many_ids(client):
+    """The ID cap is enforced by the request schema"""
+    from app.config import settings
+    
+    upload_ids = [str(uuid4()) for _ in range(settings.BULK_STATUS_MAX_IDS + 1)]
+    response = client.post("/api/v1/documents/status", json={"upload_ids": upload_ids})
+    
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
+
+
+def test_bulk_status_lookup_compact(client, db):
+    """Compact format returns positional rows"""
+    document = make_document(db, DocumentStatus.COMPLETED, chunk_count=3)
+    pending = make_document(db, chunk_count=None)
+    
+    response = client.post(
+        "/api/v1/documents/status",
+        json={"upload_ids": [document.upload_id, pending.upload_id], "format": "compact"}
+    )
+    
+    data = response.json()
+    rows = {row[0]: dict(zip(data["fields"], row)) for row in data["rows"]}
+    row = rows[document.upload_id]
+    assert row["upload_id"] == document.upload_id
+    assert row["status"] == "completed"
+    assert row["chunk_count"] == 3
+    assert rows[pending.upload_id]["chunk_count"] == 0  # same default as the full format
+
+
+def test_list_documents_metadata_opt_in(client, db):
+    """doc_metadata is only returned when requested through fields="""
+    make_document(db, DocumentStatus.COMPLETED, doc_metadata={"pages": 3})
+    params = {"status": "completed", "limit": 1}
+    
+    lean = client.get("/api/v1/documents", params=params).json()["documents"][0]
+    full = client.get(
+        "/api/v1/documents", params={**params, "fields": "doc_metadata"}
+    ).json()["documents"][0]
+    
+    assert "doc_metadata" not in lean
+    assert full["doc_metadata"] == {"pages": 3}
+    assert {k: v for k, v in full.items() if k != "doc_metadata"} == lean
+    
+    # Both shapes satisfy the documented schema
+    schema = DocumentListResponse.model_json_schema()["$defs"]["DocumentListItem"]
+    assert set(schema["required"]) <= lean.keys()
+    assert full.keys() <= schema["properties"].keys()
+
+
+def test_list_documents_unknown_field(client):
+    """Unknown optional fields are rejected"""
+    response = client.get("/api/v1/documents", params={"fields": "file_path"})
+    
+    assert response.status_code == 400
+    assert "INVALID_FIELDS" in str(response.json())
+
+
+def test_download_file_full_and_ranges(client):
+    """The original file is served whole, by byte range, or as a suffix"""
+    content = bytes(range(256)) * 40
+    files = {"file": ("blob.txt", io.BytesIO(content), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    url = f"/api/v1/documents/{upload_id}/file"
+    
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == content
+    assert full.headers["accept-ranges"] == "bytes"
+    assert "blob.txt" in full.headers["content-disposition"]
+    
+    partial = client.get(url, headers={"Range": "bytes=100-299"})
+    assert partial.status_code == 206
+    assert partial.content == content[100:300]
+    assert partial.headers["content-range"] == f"bytes 100-299/{len(content)}"
+    
+    assert client.get(url, headers={"Range": "bytes=-10"}).content == content[-10:]
+    assert client.get(url, headers={"Range": "bytes=10000-"}).content == content[10000:]
+    
+    unsatisfiable = client.get(url, headers={"Range": f"bytes={len(content)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(content)}"
+    
+    head = client.head(url)
+    assert head.status_code == 200
+    assert head.headers["content-length"] == str(len(content))
+    assert head.content == b""
+
+
+def test_openapi_operation_ids_unique(client):
+    """HEAD on the download route does not duplicate the GET operation"""
+    paths = client.get("/openapi.json").json()["paths"]
+    operation_ids = [operation["operationId"] for path in paths.values() for operation in path.values()]
+    
+    assert len(operation_ids) == len(set(operation_ids))
+    assert "head" not in paths["/api/v1/documents/{upload_id}/file"]
+
+
+def test_download_file_validators(client):
+    """ETag/Last-Modified revalidate; a stale If-Range gets the whole file"""
+    content = b"validate me " * 100
+    files = {"file": ("v.txt", io.BytesIO(content), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    url = f"/api/v1/documents/{upload_id}/file"
+    
+    first = client.get(url)
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+    
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    
+    fresh = client.get(url, headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert fresh.status_code == 206 and fresh.content == content[:10]
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200 and stale.content == content
+
+
+def test_download_file_always_closed(client, monkeypatch):
+    """The opened file is closed whether the body is sent, skipped or refused"""
+    from app.services.storage import storage_service
+    
+    files = {"file": ("c.txt", io.BytesIO(b"close me"), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    url = f"/api/v1/documents/{upload_id}/file"
+    opened = []
+    open_file = storage_service.open_file
+    
+    async def recording_open(file_path):
+        result = await open_file(file_path)
+        opened.append(result[0])
+        return result
+    
+    monkeypatch.setattr(storage_service, "open_file", recording_open)
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"Range": "bytes=100-"}).status_code == 416
+    
+    assert len(opened) == 3 and all(file.closed for file in opened)
+
+
+def test_download_file_missing(client, db):
+    """Unknown documents and documents whose file is gone are both 404"""
+    assert client.get(f"/api/v1/documents/{uuid4()}/file").status_code == 404
+    
+    document = make_document(db, file_path="./uploads/does-not-exist/doc.txt")
+    response = client.get(f"/api/v1/documents/{document.upload_id}/file")
+    assert response.status_code == 404
+    assert response.json()["detail"]["error"] == "FILE_NOT_FOUND"
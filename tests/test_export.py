@@ -0,0 +1,112 @@
+"""
+Tests for Streaming Chunk Export
+"""
+from datetime import datetime
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from app.config import settings
+from app.models.document import Document
+
+
+def numbered(name: str, words: int) -> str:
+    """Distinct words, so chunks of different documents never deduplicate"""
+    return " ".join(f"{name}{i}" for i in range(words))
+
+
+def export_rows(client, **params):
+    response = client.get("/api/v1/exports/chunks", params=params)
+    assert response.status_code == 200
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+def test_ndjson_export_streams_chunks_in_order(client, upload_and_process):
+    """Every chunk of a processed document is exported, in reading order"""
+    upload_id = upload_and_process("alpha", numbered("alpha", 1200))
+    document = client.get(f"/api/v1/documents/{upload_id}").json()
+    
+    response = client.get("/api/v1/exports/chunks")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [row for row in export_rows(client) if row["upload_id"] == upload_id]
+    
+    assert len(rows) == document["chunk_count"] > 1
+    assert [row["chunk_index"] for row in rows] == list(range(len(rows)))
+    assert rows[0]["content"].startswith("alpha0 alpha1")
+    assert rows[0]["filename"] == "alpha.txt"
+
+
+def test_resume_after_last_row(client, upload_and_process):
+    """Resuming after the last (processed_at, upload_id) returns only newer documents"""
+    first = upload_and_process("first", numbered("first", 100))
+    last = export_rows(client)[-1]
+    second = upload_and_process("second", numbered("second", 100))
+    
+    rows = export_rows(client, processed_after=last["processed_at"], after_upload_id=last["upload_id"])
+    
+    assert {row["upload_id"] for row in rows} == {second}
+    earlier = {row["upload_id"] for row in export_rows(client, processed_before=last["processed_at"])}
+    assert first in earlier and second not in earlier
+
+
+def test_resume_keeps_documents_sharing_a_timestamp(client, db, upload_and_process):
+    """A document committed with the same processed_at as the last row is not skipped"""
+    ids = sorted(upload_and_process(f"tie{i}", numbered(f"tie{i}", 100)) for i in range(2))
+    tie = datetime(2000, 1, 1)
+    db.query(Document).filter(Document.upload_id.in_(ids)).update(
+        {Document.processed_at: tie}, synchronize_session=False
+    )
+    db.commit()
+    
+    resumed = {row["upload_id"] for row in export_rows(client, processed_after=tie.isoformat(), after_upload_id=ids[0])}
+    inclusive = {row["upload_id"] for row in export_rows(client, processed_after=tie.isoformat())}
+    
+    assert ids[1] in resumed and ids[0] not in resumed
+    assert set(ids) <= inclusive
+    db.query(Document).filter(Document.upload_id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def test_recent_documents_wait_to_settle(client, upload_and_process, monkeypatch):
+    """Documents processed within EXPORT_SETTLE_SECONDS are left for the next export"""
+    monkeypatch.setattr(settings, "EXPORT_SETTLE_SECONDS", 3600)
+    upload_id = upload_and_process("unsettled", numbered("unsettled", 100))
+    
+    assert upload_id not in {row["upload_id"] for row in export_rows(client)}
+
+
+def test_after_upload_id_requires_processed_after(client):
+    response = client.get("/api/v1/exports/chunks", params={"after_upload_id": str(uuid4())})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "INVALID_EXPORT_CURSOR"
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_columnar_export(client, upload_and_process, fmt):
+    """Arrow IPC and Parquet exports read back with pyarrow"""
+    pa = pytest.importorskip("pyarrow")
+    upload_id = upload_and_process("columnar", numbered("columnar", 1200))
+    
+    response = client.get("/api/v1/exports/chunks", params={"format": fmt})
+    assert response.status_code == 200
+    if fmt == "arrow":
+        table = pa.ipc.open_stream(response.content).read_all()
+    else:
+        import pyarrow.parquet as pq
+        table = pq.read_table(pa.BufferReader(response.content))
+    
+    rows = [row for row in table.to_pylist() if row["upload_id"] == upload_id]
+    assert [row["chunk_index"] for row in rows] == list(range(len(rows)))
+    assert len(rows) > 1
+
+
+def test_deleting_document_removes_its_chunks(client, upload_and_process):
+    """Deleted documents drop out of later exports"""
+    upload_id = upload_and_process("doomed", numbered("doomed", 100))
+    assert upload_id in {row["upload_id"] for row in export_rows(client)}
+    
+    assert client.delete(f"/api/v1/documents/{upload_id}").status_code == 204
+    
+    assert upload_id not in {row["upload_id"] for row in export_rows(client)}
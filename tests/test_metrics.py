@@ -0,0 +1,50 @@
+"""
+Tests for Metrics Endpoint
+"""
+import io
+
+
+def test_metrics_endpoint_exposes_pipeline_metrics(client):
+    """Upload histograms and status gauges appear in the scrape output"""
+    files = {"file": ("test.txt", io.BytesIO(b"metrics content"), "text/plain")}
+    client.post("/api/v1/upload", files=files)
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    body = response.text
+    assert "rag_upload_bytes_count" in body
+    assert "rag_save_file_seconds_bucket" in body
+    assert 'rag_documents{status="pending"}' in body
+
+
+def test_process_document_records_stage_metrics(client):
+    """Worker stages are timed when a document is processed"""
+    from app.services.metrics import EXTRACTION_DURATION, CHUNKING_DURATION, QUEUE_WAIT
+    from app.tasks.processing import process_document
+    
+    files = {"file": ("test.txt", io.BytesIO(b"word " * 2000), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    extraction = EXTRACTION_DURATION.labels(file_type="txt")
+    counts_before = [extraction._sum.get(), CHUNKING_DURATION._sum.get(), QUEUE_WAIT._sum.get()]
+    
+    result = process_document.apply(args=[upload_id]).get()
+    
+    assert result["status"] == "success"
+    counts_after = [extraction._sum.get(), CHUNKING_DURATION._sum.get(), QUEUE_WAIT._sum.get()]
+    assert all(after > before for before, after in zip(counts_before, counts_after))
+    assert client.get(f"/api/v1/documents/{upload_id}").json()["status"] == "completed"
+
+
+def test_metrics_survive_database_errors(client, monkeypatch):
+    """A failing status query still returns the other metrics"""
+    from app.services.counters import status_counters
+    
+    def broken(db):
+        raise RuntimeError("database is down")
+    
+    monkeypatch.setattr(status_counters, "get_counts", broken)
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert "rag_upload_bytes_count" in response.text
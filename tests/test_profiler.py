@@ -0,0 +1,73 @@
+"""
+Tests for Request/Task Profiling
+"""
+import pstats
+
+import pytest
+
+from app.config import settings
+
+ADMIN = {"X-Admin-Token": "admin-secret"}
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    """Enable profiling into a temporary ring, without random sampling"""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    return tmp_path
+
+
+def test_profile_header_captures_request(client, profiling):
+    """A request carrying the token in the profile header is profiled and downloadable"""
+    client.get("/api/v1/documents")
+    assert client.get("/api/v1/admin/profiles", headers=ADMIN).json()["profiles"] == []
+    
+    client.get("/api/v1/documents", headers={"X-Profile": "admin-secret"})
+    client.get("/api/v1/documents", headers={"X-Profile": "wrong"})
+    
+    profiles = client.get("/api/v1/admin/profiles", headers=ADMIN).json()["profiles"]
+    assert len(profiles) == 1
+    assert profiles[0]["kind"] == "request"
+    assert "GET_api_v1_documents" in profiles[0]["name"]
+    
+    response = client.get(f"/api/v1/admin/profiles/{profiles[0]['name']}", headers=ADMIN)
+    assert response.status_code == 200
+    path = profiling / "downloaded.prof"
+    path.write_bytes(response.content)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_profile_ring_is_bounded(client, profiling, monkeypatch):
+    """Oldest profiles are evicted beyond PROFILE_MAX_FILES"""
+    monkeypatch.setattr(settings, "PROFILE_MAX_FILES", 3)
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    
+    for _ in range(5):
+        client.get("/health")
+    
+    assert len(list(profiling.glob("*.prof"))) == 3
+
+
+def test_task_profiled_when_requested(profiling):
+    """Celery tasks sent with the profile header are captured"""
+    from app.tasks.maintenance import reconcile_status_counts
+    
+    reconcile_status_counts.apply(headers={"profile": True}).get()
+    
+    names = [path.name for path in profiling.glob("*.prof")]
+    assert len(names) == 1
+    assert "-task-app.tasks.maintenance.reconcile_status_counts-" in names[0]
+
+
+def test_admin_endpoints_require_token(client, profiling, monkeypatch):
+    """Wrong tokens are rejected, unknown names 404, and no token disables admin"""
+    assert client.get("/api/v1/admin/profiles").status_code == 403
+    assert client.get("/api/v1/admin/profiles/../../etc/passwd", headers=ADMIN).status_code == 404
+    
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    response = client.get("/api/v1/admin/profiles", headers=ADMIN)
+    assert response.status_code == 404
+    assert response.json()["detail"]["error"] == "ADMIN_DISABLED"
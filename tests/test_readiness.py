@@ -0,0 +1,82 @@
+"""
+Tests for Readiness Endpoint
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.readiness import readiness_service
+
+ADMIN = {"X-Admin-Token": "ready-secret"}
+
+
+async def ok_probe():
+    return {}
+
+
+async def failing_probe():
+    raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Fresh cache; broker and workers answer without Redis or Celery"""
+    monkeypatch.setattr(readiness_service, "_result", None)
+    monkeypatch.setattr(readiness_service, "_probe_broker", ok_probe)
+    monkeypatch.setattr(readiness_service, "_probe_workers", ok_probe)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", ADMIN["X-Admin-Token"])
+    return monkeypatch
+
+
+def test_ready_reports_each_probe(client, probes):
+    """All probes run and report latency; the next call is served from cache"""
+    response = client.get("/ready")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["cached"] is False
+    assert set(data["probes"]) == {"database", "broker", "storage", "workers"}
+    assert all(probe["ok"] and probe["latency_ms"] >= 0 for probe in data["probes"].values())
+    assert data["probes"]["storage"]["detail"]["free_bytes"] > 0
+    
+    assert client.get("/ready").json()["cached"] is True
+    assert client.get("/ready", params={"fresh": True}, headers=ADMIN).json()["cached"] is False
+
+
+def test_fresh_check_needs_admin_token(client, probes):
+    """Anonymous callers cannot bypass the cache and fan out probes"""
+    assert client.get("/ready", params={"fresh": True}).status_code == 403
+    assert client.get("/ready", params={"fresh": True}, headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_required_probe_failure_is_not_ready(client, probes):
+    """A failing broker makes the service unready; missing workers do not"""
+    probes.setattr(readiness_service, "_probe_workers", failing_probe)
+    assert client.get("/ready", params={"fresh": True}, headers=ADMIN).status_code == 200
+    
+    probes.setattr(readiness_service, "_probe_broker", failing_probe)
+    response = client.get("/ready", params={"fresh": True}, headers=ADMIN)
+    
+    assert response.status_code == 503
+    data = response.json()
+    assert data["status"] == "not_ready"
+    assert data["probes"]["broker"]["error"] == "connection refused"
+    assert data["probes"]["workers"]["required"] is False
+
+
+def test_slow_probe_times_out_without_blocking_others(client, probes):
+    """Probes run concurrently, each bounded by READY_PROBE_TIMEOUT"""
+    async def hanging_probe():
+        await asyncio.sleep(5)
+    
+    probes.setattr(settings, "READY_PROBE_TIMEOUT", 0.2)
+    probes.setattr(readiness_service, "_probe_broker", hanging_probe)
+    probes.setattr(readiness_service, "_probe_workers", hanging_probe)
+    
+    data = client.get("/ready", params={"fresh": True}, headers=ADMIN).json()
+    
+    assert "timed out" in data["probes"]["broker"]["error"]
+    assert data["probes"]["database"]["ok"]
+    assert data["probes"]["workers"]["latency_ms"] < 1000
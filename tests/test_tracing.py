@@ -0,0 +1,64 @@
+"""
+Tests for Upload-to-Worker Tracing
+"""
+import io
+import json
+
+from app.config import settings
+
+
+def traced_upload(upload_and_process, enqueued_documents):
+    """Upload and process a document; returns its id and the task message headers"""
+    upload_id = upload_and_process("trace", "trace me " * 500)
+    return upload_id, enqueued_documents[-1]["headers"]
+
+
+def test_timings_follow_trace_into_worker(client, upload_and_process, enqueued_documents):
+    """Upload and worker stages share one trace id and are returned on request"""
+    upload_id, headers = traced_upload(upload_and_process, enqueued_documents)
+    
+    data = client.get(f"/api/v1/documents/{upload_id}", params={"timings": True}).json()
+    
+    assert data["status"] == "completed"
+    assert data["timings"]["trace_id"] == headers["trace_id"]
+    assert {"save_file", "queue_wait", "extract_text", "chunk_text"} <= data["timings"]["spans"].keys()
+    assert {"save_file", "commit_upload"} <= data["timings"]["spans"].keys()
+    
+    default = client.get(f"/api/v1/documents/{upload_id}").json()
+    assert "timings" not in default
+    assert "trace" not in default["doc_metadata"]
+
+
+def test_spans_exported_as_otlp_json(upload_and_process, enqueued_documents, monkeypatch, tmp_path):
+    """Exported spans form one tree: worker spans hang off the upload span"""
+    export_path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACE_EXPORT_PATH", str(export_path))
+    
+    _, headers = traced_upload(upload_and_process, enqueued_documents)
+    
+    spans = [
+        span
+        for line in export_path.read_text().splitlines()
+        for resource in json.loads(line)["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for span in scope["spans"]
+    ]
+    by_name = {span["name"]: span for span in spans}
+    assert {span["traceId"] for span in spans} == {headers["trace_id"]}
+    assert by_name["upload"]["spanId"] == headers["parent_span_id"]
+    assert by_name["process_document"]["parentSpanId"] == headers["parent_span_id"]
+    assert by_name["extract_text"]["parentSpanId"] == by_name["process_document"]["spanId"]
+    assert int(by_name["chunk_text"]["endTimeUnixNano"]) >= int(by_name["chunk_text"]["startTimeUnixNano"])
+
+
+def test_upload_spans_travel_with_the_task(client, enqueued_documents):
+    """Upload spans finished after the insert are sent to the worker, not written again"""
+    files = {"file": ("early.txt", io.BytesIO(b"timed upload " * 100), "text/plain")}
+    upload_id = client.post("/api/v1/upload", files=files).json()["upload_id"]
+    
+    spans = client.get(f"/api/v1/documents/{upload_id}", params={"timings": True}).json()["timings"]["spans"]
+    headers = enqueued_documents[-1]["headers"]
+    
+    assert set(spans) == {"save_file"}
+    assert {"save_file", "commit_upload"} <= headers["upload_timings"].keys()
+    assert headers["enqueued_ns"] > 0
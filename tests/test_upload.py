@@ -2,45 +2,20 @@
 Tests for Upload Endpoint
 """
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from uuid import UUID
 import io
 
-from app.main import app
-from app.database import Base, get_db
 from app.models.document import DocumentStatus
 
-# Test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create test database
-Base.metadata.create_all(bind=engine)
-
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-
-app.dependency_overrides[get_db] = override_get_db
-client = TestClient(app)
-
-
-def test_health_check():
+def test_health_check(client):
     """Test health check endpoint"""
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
 
-def test_upload_text_file():
+def test_upload_text_file(client):
     """Test uploading a text file"""
     # Create test file
     file_content = b"This is a test document for RAG system."
@@ -59,7 +34,7 @@ def test_upload_text_file():
     assert data["file_size"] == len(file_content)
 
 
-def test_upload_unsupported_file_type():
+def test_upload_unsupported_file_type(client):
     """Test uploading unsupported file type"""
     files = {
         "file": ("test.jpg", io.BytesIO(b"fake image"), "image/jpeg")
@@ -72,7 +47,7 @@ def test_upload_unsupported_file_type():
     assert "UNSUPPORTED_FILE_TYPE" in str(data)
 
 
-def test_upload_empty_file():
+def test_upload_empty_file(client):
     """Test uploading empty file"""
     files = {
         "file": ("empty.txt", io.BytesIO(b""), "text/plain")
@@ -85,7 +60,7 @@ def test_upload_empty_file():
     assert "EMPTY_FILE" in str(data)
 
 
-def test_upload_large_file():
+def test_upload_large_file(client):
     """Test uploading file that exceeds size limit"""
     # Create 51MB file
     large_content = b"x" * (51 * 1024 * 1024)
@@ -100,7 +75,7 @@ def test_upload_large_file():
     assert "FILE_TOO_LARGE" in str(data)
 
 
-def test_list_documents():
+def test_list_documents(client):
     """Test listing documents"""
     response = client.get("/api/v1/documents")
     
@@ -111,7 +86,7 @@ def test_list_documents():
     assert isinstance(data["documents"], list)
 
 
-def test_get_document():
+def test_get_document(client):
     """Test getting document details"""
     # First upload a document
     files = {
@@ -129,7 +104,7 @@ def test_get_document():
     assert data["filename"] == "test.txt"
 
 
-def test_get_nonexistent_document():
+def test_get_nonexistent_document(client):
     """Test getting non-existent document"""
     fake_uuid = "00000000-0000-0000-0000-000000000000"
     response = client.get(f"/api/v1/documents/{fake_uuid}")
@@ -139,7 +114,7 @@ def test_get_nonexistent_document():
     assert "DOCUMENT_NOT_FOUND" in str(data)
 
 
-def test_delete_document():
+def test_delete_document(client):
     """Test deleting a document"""
     # First upload a document
     files = {